@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+"""Measure pyentist's own overhead.
+
+Every case is an operation that is timed in a loop (``ns_per_op``, best of
+several repeats) and then run a few more times under ``tracemalloc`` with the
+garbage collector disabled. ``peak_bytes_per_op`` is the traced memory
+high-water mark of a run. ``allocs_per_op`` is the number of memory blocks
+still allocated after it, while the value the operation returned (usually a
+``Result``) is kept alive. Both report the worst of the memory runs.
+
+Experiments run their behaviors in random order, and the order changes how
+much memory is alive at once. ``random`` is seeded before the timing loop and
+before each memory run, so the same orders are measured every time.
+
+    python benchmarks/run.py                       # print a table
+    python benchmarks/run.py --output bench.json   # also write JSON
+    python benchmarks/run.py --compare bench.json  # flag regressions
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyentist
+
+
+def control():
+    return {'id': 1, 'tags': ['a', 'b', 'c'], 'score': 0.5}
+
+
+def candidate():
+    return {'id': 1, 'tags': ['a', 'b', 'c'], 'score': 0.5}
+
+
+def other_candidate():
+    return {'id': 1, 'tags': ['a', 'b', 'c'], 'score': 0.25}
+
+
+def compare_values(a, b):
+    return a.returned_value == b.returned_value
+
+
+def heavy_compare(a, b):
+    return (
+        sorted(a.returned_value.items(), key=repr)
+        == sorted(b.returned_value.items(), key=repr)
+    )
+
+
+def make_ignorer(key):
+    return lambda a, b: a.get(key) != b.get(key) and key == 'never'
+
+
+class Recorder(pyentist.DefaultExperiment):
+    published = 0
+
+    def publish(self, result):
+        self.published += len(result.candidates)
+        for observation in result.observations:
+            observation.duration
+        result.context
+        result.was_mismatched
+
+
+def bare_call():
+    return control()
+
+
+def science_without_candidates():
+    with pyentist.science('bench') as e:
+        e.use(control)
+    return e.result
+
+
+def disabled():
+    with pyentist.science('bench') as e:
+        e.percent = 0
+        e.use(control)
+        e.try_candidate(candidate)
+    return e.result
+
+
+def one_candidate():
+    with pyentist.science('bench') as e:
+        e.comparer = compare_values
+        e.use(control)
+        e.try_candidate(candidate)
+    return e.result
+
+
+def many_candidates(count=8):
+    with pyentist.science('bench') as e:
+        e.comparer = compare_values
+        e.use(control)
+        for i in range(count):
+            e.try_candidate('candidate{}'.format(i), candidate)
+    return e.result
+
+
+def heavy_comparer_and_ignorers():
+    with pyentist.science('bench') as e:
+        e.comparer = heavy_compare
+        for key in ('id', 'tags', 'score', 'missing', 'never'):
+            e.add_ignorer(make_ignorer(key))
+        e.use(control)
+        e.try_candidate(other_candidate)
+    e.result.was_mismatched
+    return e.result
+
+
+def large_return_values():
+    with pyentist.science('bench') as e:
+        e.comparer = compare_values
+        e.use(lambda: list(range(100000)))
+        e.try_candidate(lambda: list(range(100000)))
+    e.result.was_mismatched
+    return e.result
+
+
+def large_return_values_fingerprinted():
+    with pyentist.science('bench') as e:
+        e.fingerprint_values = True
+        e.use(lambda: list(range(100000)))
+        e.try_candidate(lambda: list(range(100000)))
+    e.result.was_mismatched
+    return e.result
+
+
+def publish():
+    with pyentist.science('bench', {'experiment_class': Recorder, 'context': {'user': 1}}) as e:
+        e.comparer = compare_values
+        e.use(control)
+        e.try_candidate(candidate)
+    return e.result
+
+
+enabled_definition = pyentist.define(
+    'bench', lambda: control(), candidates=lambda: candidate(), comparer=compare_values
+)
+disabled_definition = pyentist.define(
+    'bench', lambda: control(), candidates=lambda: candidate(), enabled=False
+)
+
+
+def definition():
+    return enabled_definition()
+
+
+def definition_disabled():
+    return disabled_definition()
+
+
+CASES = [
+    ('bare_call', bare_call),
+    ('science_without_candidates', science_without_candidates),
+    ('disabled', disabled),
+    ('one_candidate', one_candidate),
+    ('many_candidates', many_candidates),
+    ('heavy_comparer_and_ignorers', heavy_comparer_and_ignorers),
+    ('large_return_values', large_return_values),
+    ('large_return_values_fingerprinted', large_return_values_fingerprinted),
+    ('publish', publish),
+    ('definition', definition),
+    ('definition_disabled', definition_disabled),
+]
+
+
+METRICS = [
+    # (key, unit, smallest increase counted as a regression)
+    ('ns_per_op', 'ns/op', 0),
+    ('allocs_per_op', 'allocs/op', 2),
+    ('peak_bytes_per_op', 'peak bytes/op', 1024),
+]
+
+
+def time_op(op, repeats, min_time):
+    random.seed(0)
+    loops = 1
+    while True:
+        started = time.perf_counter_ns()
+        for _ in range(loops):
+            op()
+        elapsed = time.perf_counter_ns() - started
+        if elapsed >= min_time * 1e9:
+            break
+        loops *= 2
+
+    best = elapsed
+    for _ in range(repeats - 1):
+        started = time.perf_counter_ns()
+        for _ in range(loops):
+            op()
+        best = min(best, time.perf_counter_ns() - started)
+
+    return best / loops
+
+
+def measure_memory(op, runs=4):
+    allocs = peak = 0
+    for seed in range(runs):
+        run_allocs, run_peak = measure_memory_once(op, seed)
+        allocs = max(allocs, run_allocs)
+        peak = max(peak, run_peak)
+    return allocs, peak
+
+
+def measure_memory_once(op, seed):
+    random.seed(seed)
+    op()
+    random.seed(seed)
+    gc.collect()
+    gc.disable()
+    try:
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            blocks = sys.getallocatedblocks()
+            kept = op()
+            allocs = sys.getallocatedblocks() - blocks
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            del kept
+        finally:
+            tracemalloc.stop()
+    finally:
+        gc.enable()
+
+    return allocs, peak
+
+
+def run(names=None, repeats=5, min_time=0.2, memory_runs=4):
+    results = {}
+    for name, op in CASES:
+        if names and name not in names:
+            continue
+
+        ns_per_op = time_op(op, repeats, min_time)
+        allocs, peak = measure_memory(op, memory_runs)
+        results[name] = {
+            'ns_per_op': round(ns_per_op, 1),
+            'allocs_per_op': allocs,
+            'peak_bytes_per_op': peak,
+        }
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get('cases', {}).get(name)
+        if not previous:
+            continue
+        for key, unit, floor in METRICS:
+            if key not in previous:
+                continue
+            before, after = previous[key], current[key]
+            if after - before > floor and after > before * (1 + threshold):
+                change = '({:+.0%})'.format(after / before - 1) if before else '(new)'
+                regressions.append('{}: {:.0f} {} -> {:.0f} {} {}'.format(
+                    name, before, unit, after, unit, change
+                ))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('cases', nargs='*', help='cases to run (default: all)')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', help='JSON file from an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='increase ratio counted as a regression (default: 0.1)')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='seconds each timing repeat runs for at least')
+    parser.add_argument('--memory-runs', type=int, default=4,
+                        help='seeded memory runs; the worst is reported (default: 4)')
+    args = parser.parse_args(argv)
+
+    results = run(args.cases, args.repeats, args.min_time, args.memory_runs)
+    report = {
+        'python': platform.python_implementation() + ' ' + platform.python_version(),
+        'platform': platform.platform(),
+        'cases': results,
+    }
+
+    print('{:<30} {:>12} {:>8} {:>12}'.format('case', 'ns/op', 'allocs', 'peak bytes'))
+    for name, case in results.items():
+        print('{:<30} {:>12.1f} {:>8} {:>12}'.format(
+            name, case['ns_per_op'], case['allocs_per_op'], case['peak_bytes_per_op']
+        ))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
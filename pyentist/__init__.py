@@ -2,39 +2,107 @@ from .errors import *
 from .result import Result
 from .experiment import Experiment
 from .observation import Observation
-from .default import DefaultExperiment
+from .invocation import Invocation
+from .asynchronous import AsyncExperiment, AsyncObservation
+from .default import DefaultExperiment, AsyncDefaultExperiment
+from .executors import CandidatePool, ProcessCandidatePool
+from .background import BackgroundWorker
+from .throttle import OverheadThrottle
+from .breaker import CircuitBreaker
+from .comparers import DeepComparer, ArrayComparer
+from .streams import ObservedStream, StreamObservation
+from .stats import Aggregator, LatencyHistogram, PairedComparison
+from .records import to_record, RecordWriter, iter_records
+from .publishers import BatchingPublisher, StreamPublisher, FilePublisher
+from .recorder import Recorder, iter_calls
+from .definition import ExperimentDefinition, define, experiment
+from .context import (
+    scientist_context, set_default_context, clear_default_context, current_context
+)
 
-from contextlib import contextmanager
 
-@contextmanager
-def science(name, options=None):
-    if options and 'experiment_class' in options:
-        args = 'args' in options and options['args'] or []
-        kwargs = 'kwargs' in options and options['kwargs'] or {}
-        experiment = options['experiment_class'](name, *args, **kwargs)
-    else:
-        experiment = DefaultExperiment(name)
+class _Science(object):
+
+    def __init__(self, name, options=None):
+        self.name = name
+        self.options = options or {}
+        self.experiment = None
+
+    def _create_experiment(self, default_class):
+        options = self.options
+        if 'experiment_class' in options:
+            args = options.get('args') or []
+            kwargs = options.get('kwargs') or {}
+            experiment = options['experiment_class'](self.name, *args, **kwargs)
+        else:
+            experiment = default_class(self.name)
+
+        if 'context' in options:
+            experiment.context = options['context']
+        if 'recorder' in options:
+            experiment.recorder = options['recorder']
+
+        self.experiment = experiment
+        return experiment
 
-    if options and 'context' in options:
-        experiment.context = options['context']
-    else:
-        experiment.context = default_scientist_context()
+    def __enter__(self):
+        return self._create_experiment(DefaultExperiment)
 
-    yield experiment
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.experiment.run(self.options.get('run', 'control'))
 
-    if options and 'run' in options:
-        experiment.run(options['run'])
-    else:
-        experiment.run()
+    async def __aenter__(self):
+        return self._create_experiment(AsyncDefaultExperiment)
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            await self.experiment.run(self.options.get('run', 'control'))
+
+
+def science(name, options=None):
+    return _Science(name, options)
 
 
 def default_scientist_context():
-    return {}
+    return current_context()
 
 __all__ = [
     'BadBehaviorError', 'BehaviorMissingError', 'BehaviorNotUniqueError', 'NoValueError', 'MismatchError',
+    'RecordedError',
     'Result',
     'Experiment',
     'Observation',
+    'Invocation',
+    'AsyncExperiment',
+    'AsyncObservation',
     'DefaultExperiment',
+    'AsyncDefaultExperiment',
+    'CandidatePool',
+    'ProcessCandidatePool',
+    'BackgroundWorker',
+    'OverheadThrottle',
+    'CircuitBreaker',
+    'DeepComparer',
+    'ArrayComparer',
+    'ObservedStream',
+    'StreamObservation',
+    'Aggregator',
+    'LatencyHistogram',
+    'PairedComparison',
+    'to_record',
+    'RecordWriter',
+    'iter_records',
+    'BatchingPublisher',
+    'StreamPublisher',
+    'FilePublisher',
+    'Recorder',
+    'iter_calls',
+    'ExperimentDefinition',
+    'define',
+    'experiment',
+    'scientist_context',
+    'set_default_context',
+    'clear_default_context',
+    'default_scientist_context',
 ]
@@ -0,0 +1,179 @@
+import asyncio
+import inspect
+import time
+
+from .experiment import Experiment
+from .observation import Observation, _NOT_CLEANED
+from .invocation import Invocation
+from .context import capture
+from .result import Result
+from .errors import BehaviorMissingError, MismatchError
+
+
+class AsyncObservation(Observation):
+    __slots__ = ()
+
+    def __init__(self, name, experiment, callback):
+        self.name = name
+        self.experiment = experiment
+        self.callback = callback
+        self.timed_out = False
+        self.returned_value = None
+        self.raised_exception = None
+        self._cleaned_value = _NOT_CLEANED
+        self.value_cleaned = False
+        self.now = None
+        self.started_ns = None
+        self.duration = None
+        self.duration_ns = None
+        self.metrics = None
+        self.fingerprint = None
+        self.released = False
+
+    def _finish(self):
+        self.duration_ns = time.perf_counter_ns() - self.started_ns
+        self.duration = self.duration_ns / 1e9
+
+    async def observe(self, timeout=None, args=(), kwargs=None):
+        self.now = time.time()
+        self.started_ns = time.perf_counter_ns()
+
+        try:
+            value = self.callback(*args, **(kwargs or {}))
+            if inspect.isawaitable(value):
+                if timeout is None:
+                    value = await value
+                else:
+                    value = await asyncio.wait_for(value, timeout)
+            self.returned_value = value
+        except asyncio.TimeoutError as e:
+            if timeout is None:
+                self.raised_exception = e
+            else:
+                self.timed_out = True
+        except asyncio.CancelledError:
+            self.timed_out = True
+            self._finish()
+            raise
+        except Exception as e:
+            self.raised_exception = e
+
+        self._finish()
+        if self.experiment.fingerprint_values:
+            self.take_fingerprint()
+        return self
+
+
+class AsyncExperiment(Experiment):
+    publish_in_background = False
+    background_failures = 0
+
+    def __init__(self, name="experiment"):
+        super(AsyncExperiment, self).__init__(name)
+        self._pending_tasks = set()
+
+    async def run(self, name='control', args=(), kwargs=None):
+        invocation = await self.invoke(name, args, kwargs)
+        self.result = invocation.result
+
+        if invocation.raised_exception is not None:
+            raise invocation.raised_exception
+        else:
+            self.returned_value = invocation.returned_value
+            return self.returned_value
+
+    async def invoke(self, name='control', args=(), kwargs=None):
+        callback = self.behaviors.get(name, None)
+        if not callback:
+            raise BehaviorMissingError(self, name)
+
+        if self.recorder and self._should_record():
+            invocation = Invocation(self, name, args, kwargs)
+            invocation.context = capture(self._context)
+            control = await AsyncObservation(name, self, callback).observe(None, args, kwargs)
+            invocation.observed(control)
+            self._record_call(invocation, control.duration)
+            return invocation
+
+        if self.recorder or not self._should_experiment_run():
+            invocation = Invocation(self, name, args, kwargs)
+            try:
+                value = callback(*args, **(kwargs or {}))
+                if inspect.isawaitable(value):
+                    value = await value
+                invocation.returned_value = value
+            except Exception as e:
+                invocation.raised_exception = e
+            return invocation
+
+        invocation = Invocation(self, name, args, kwargs)
+        invocation.context = capture(self._context)
+
+        if self.before_run:
+            self.before_run()
+
+        behaviors_names = self._behaviors_names(name)
+
+        observations = [
+            AsyncObservation(key, self, self.behaviors[key])
+            for key in behaviors_names
+        ]
+        control = next(observation for observation in observations if observation.name == name)
+        candidates = [
+            asyncio.ensure_future(observation.observe(self.candidate_timeout, args, kwargs))
+            for observation in observations
+            if observation is not control
+        ]
+
+        await control.observe(None, args, kwargs)
+        invocation.observed(control)
+
+        if self.publish_in_background:
+            task = asyncio.ensure_future(self._complete(invocation, observations, candidates))
+            self._pending_tasks.add(task)
+            task.add_done_callback(self._background_done)
+        else:
+            result = await self._complete(invocation, observations, candidates)
+
+            if self.should_raise_on_mismatch and result.was_mismatched:
+                raise MismatchError(self.name, result)
+
+        return invocation
+
+    async def _complete(self, invocation, observations, candidates):
+        control = invocation.control
+        if candidates:
+            timeout = None
+            if self.overhead_budget is not None:
+                deadline = (control.started_ns + control.duration_ns) / 1e9 + self.overhead_budget
+                timeout = max(deadline - time.perf_counter(), 0)
+
+            done, pending = await asyncio.wait(candidates, timeout=timeout)
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.wait(pending)
+
+        result = Result(self, observations, control, invocation.context)
+        invocation.result = result
+        self._record(result)
+
+        try:
+            published = self.publish(result)
+            if inspect.isawaitable(published):
+                await published
+        except Exception as e:
+            self.raised('publish', e)
+
+        return result
+
+    def _background_done(self, task):
+        self._pending_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.background_failures += 1
+
+    async def flush(self):
+        pending = [task for task in self._pending_tasks if not task.done()]
+        while pending:
+            await asyncio.wait(pending)
+            pending = [task for task in self._pending_tasks if not task.done()]
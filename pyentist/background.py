@@ -0,0 +1,97 @@
+import collections
+import contextvars
+import threading
+
+
+class BackgroundWorker(object):
+    DROP_NEWEST = 'drop_newest'
+    DROP_OLDEST = 'drop_oldest'
+
+    def __init__(self, max_queue=1000, overflow=DROP_NEWEST):
+        if overflow not in (BackgroundWorker.DROP_NEWEST, BackgroundWorker.DROP_OLDEST):
+            raise ValueError(
+                "overflow must be '{}' or '{}'".format(
+                    BackgroundWorker.DROP_NEWEST, BackgroundWorker.DROP_OLDEST
+                )
+            )
+
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.submitted = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+
+        self._queue = collections.deque()
+        self._active = 0
+        self._closed = False
+        self._thread = None
+        self._condition = threading.Condition()
+
+    @property
+    def pending(self):
+        with self._condition:
+            return len(self._queue) + self._active
+
+    def submit(self, func, *args):
+        with self._condition:
+            if self._closed:
+                self.dropped += 1
+                return False
+
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                if self.overflow == BackgroundWorker.DROP_NEWEST:
+                    return False
+                self._queue.popleft()
+
+            self._queue.append((contextvars.copy_context(), func, args))
+            self.submitted += 1
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._work, name='pyentist-background', daemon=True
+                )
+                self._thread.start()
+
+            self._condition.notify_all()
+        return True
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                context, func, args = self._queue.popleft()
+                self._active += 1
+
+            failed = False
+            try:
+                context.run(func, *args)
+            except Exception:
+                failed = True
+
+            with self._condition:
+                self._active -= 1
+                if failed:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+                self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._queue and not self._active, timeout
+            )
+
+    def shutdown(self, wait=True, timeout=None):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+
+        if wait and thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,124 @@
+import collections
+import threading
+import time
+
+
+class _Circuit(object):
+
+    def __init__(self, window):
+        self.state = CircuitBreaker.CLOSED
+        self.opened_at = None
+        self.probed_at = None
+        self.samples = collections.deque(maxlen=window)
+
+
+class CircuitBreaker(object):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, window=100, min_samples=20, max_mismatch_rate=None,
+                 max_exception_rate=None, max_slowdown=None, cooldown=60,
+                 on_state_change=None):
+        self.window = window
+        self.min_samples = min_samples
+        self.max_mismatch_rate = max_mismatch_rate
+        self.max_exception_rate = max_exception_rate
+        self.max_slowdown = max_slowdown
+        self.cooldown = cooldown
+        self.on_state_change = on_state_change
+
+        self._circuits = {}
+        self._lock = threading.RLock()
+
+    def _circuit(self, name):
+        circuit = self._circuits.get(name)
+        if circuit is None:
+            circuit = self._circuits.setdefault(name, _Circuit(self.window))
+        return circuit
+
+    def state(self, name):
+        circuit = self._circuits.get(name)
+        return circuit.state if circuit else CircuitBreaker.CLOSED
+
+    def allows(self, name):
+        circuit = self._circuits.get(name)
+        if circuit is None or circuit.state == CircuitBreaker.CLOSED:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            if circuit.state == CircuitBreaker.OPEN:
+                if now - circuit.opened_at < self.cooldown:
+                    return False
+                self._change(name, circuit, CircuitBreaker.HALF_OPEN)
+            elif circuit.probed_at is not None and now - circuit.probed_at < self.cooldown:
+                return False
+
+            circuit.probed_at = now
+            return True
+
+    def record(self, result):
+        control = result.control
+        if self.max_mismatch_rate is not None:
+            mismatched = set(id(candidate) for candidate in result.mismatched)
+        else:
+            mismatched = ()
+
+        for candidate in result.candidates:
+            if candidate.timed_out:
+                ratio = float('inf')
+            elif control is not None and control.duration and candidate.duration is not None:
+                ratio = candidate.duration / control.duration
+            else:
+                ratio = None
+
+            sample = (
+                id(candidate) in mismatched,
+                candidate.raised_exception is not None,
+                ratio,
+            )
+
+            with self._lock:
+                circuit = self._circuit(candidate.name)
+                if circuit.state == CircuitBreaker.HALF_OPEN:
+                    circuit.samples.clear()
+                    circuit.samples.append(sample)
+                    if self._is_tripped(circuit.samples):
+                        self._open(candidate.name, circuit)
+                    else:
+                        circuit.samples.clear()
+                        self._change(candidate.name, circuit, CircuitBreaker.CLOSED)
+                elif circuit.state == CircuitBreaker.CLOSED:
+                    circuit.samples.append(sample)
+                    if len(circuit.samples) >= self.min_samples and self._is_tripped(circuit.samples):
+                        self._open(candidate.name, circuit)
+
+    def _is_tripped(self, samples):
+        count = len(samples)
+
+        if self.max_mismatch_rate is not None:
+            if sum(1 for sample in samples if sample[0]) / count > self.max_mismatch_rate:
+                return True
+
+        if self.max_exception_rate is not None:
+            if sum(1 for sample in samples if sample[1]) / count > self.max_exception_rate:
+                return True
+
+        if self.max_slowdown is not None:
+            ratios = sorted(sample[2] for sample in samples if sample[2] is not None)
+            if ratios and ratios[len(ratios) // 2] > self.max_slowdown:
+                return True
+
+        return False
+
+    def _open(self, name, circuit):
+        circuit.opened_at = time.monotonic()
+        circuit.probed_at = None
+        circuit.samples.clear()
+        self._change(name, circuit, CircuitBreaker.OPEN)
+
+    def _change(self, name, circuit, state):
+        previous, circuit.state = circuit.state, state
+        if self.on_state_change and previous != state:
+            self.on_state_change(name, previous, state)
@@ -0,0 +1,290 @@
+import collections
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+MISSING = type('Missing', (object,), {'__repr__': lambda self: '<missing>'})()
+
+_NUMBERS = (int, float)
+_SEQUENCES = (list, tuple)
+
+
+class _Attribute(str):
+    pass
+
+
+class _Index(tuple):
+    pass
+
+
+def _format_key(key):
+    if isinstance(key, _Attribute):
+        return '.' + key
+    if isinstance(key, _Index):
+        return '[{}]'.format(', '.join(str(index) for index in key))
+    return '[{!r}]'.format(key)
+
+
+def format_path(path):
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    return ''.join(_format_key(key) for key in reversed(keys))
+
+
+class DeepComparer(object):
+    _array_types = ()
+
+    def __init__(self, tolerance=0.0, relative_tolerance=0.0, ignore_order=False,
+                 max_differences=10):
+        self.tolerance = tolerance
+        self.relative_tolerance = relative_tolerance
+        self.ignore_order = ignore_order
+        self.max_differences = max_differences
+
+    def __call__(self, control, candidate):
+        if control.raised_exception is not None or candidate.raised_exception is not None:
+            return control.is_equivalent_to(candidate)
+        return self.equal(control.cleaned_value, candidate.cleaned_value)
+
+    def equal(self, a, b):
+        return not self._walk(a, b, 1)
+
+    def differences(self, control, candidate, limit=None):
+        if control.raised_exception is not None or candidate.raised_exception is not None:
+            if control.is_equivalent_to(candidate):
+                return []
+            return [('', control.raised_exception, candidate.raised_exception)]
+
+        differences = self._walk(
+            control.cleaned_value, candidate.cleaned_value, limit or self.max_differences
+        )
+        return [(format_path(path), a, b) for path, a, b in differences]
+
+    def _numbers_equal(self, a, b):
+        if a == b:
+            return True
+        if isinstance(a, float) and isinstance(b, float) and a != a and b != b:
+            return True
+        if self.tolerance or self.relative_tolerance:
+            return math.isclose(
+                a, b, rel_tol=self.relative_tolerance, abs_tol=self.tolerance
+            )
+        return False
+
+    def _unordered_equal(self, a, b):
+        if len(a) != len(b):
+            return False
+
+        if not self.tolerance and not self.relative_tolerance:
+            try:
+                return collections.Counter(a) == collections.Counter(b)
+            except TypeError:
+                pass
+
+        remaining = list(b)
+        for item in a:
+            for index, other in enumerate(remaining):
+                if self.equal(item, other):
+                    del remaining[index]
+                    break
+            else:
+                return False
+        return True
+
+    def _walk(self, a, b, limit):
+        differences = []
+        stack = [(None, a, b)]
+
+        while stack:
+            path, a, b = stack.pop()
+            if a is b:
+                continue
+
+            if self._array_types and (
+                isinstance(a, self._array_types) or isinstance(b, self._array_types)
+            ):
+                differences.extend(self._array_differences(path, a, b, limit - len(differences)))
+                if len(differences) >= limit:
+                    break
+                continue
+
+            a_type, b_type = type(a), type(b)
+
+            if a_type in _NUMBERS and b_type in _NUMBERS:
+                if self._numbers_equal(a, b):
+                    continue
+            elif isinstance(a, dict) and isinstance(b, dict):
+                if len(a) == len(b) and a.keys() == b.keys():
+                    keys = list(a)
+                else:
+                    keys = list(a) + [key for key in b if key not in a]
+                stack.extend(
+                    ((path, key), a.get(key, MISSING), b.get(key, MISSING))
+                    for key in reversed(keys)
+                )
+                continue
+            elif a_type is not b_type:
+                pass
+            elif isinstance(a, _SEQUENCES):
+                if self.ignore_order:
+                    if self._unordered_equal(a, b):
+                        continue
+                elif len(a) == len(b):
+                    stack.extend(
+                        ((path, index), a[index], b[index]) for index in range(len(a) - 1, -1, -1)
+                    )
+                    continue
+            elif a == b:
+                continue
+
+            differences.append((path, a, b))
+            if len(differences) >= limit:
+                break
+
+        return differences
+
+
+_NUMERIC_KINDS = 'iufc'
+
+
+class ArrayComparer(DeepComparer):
+
+    def __init__(self, tolerance=0.0, relative_tolerance=0.0, equal_nan=True, check_dtype=True,
+                 ignore_order=False, max_differences=10):
+        if numpy is None:
+            raise ImportError('ArrayComparer needs numpy')
+
+        super(ArrayComparer, self).__init__(
+            tolerance, relative_tolerance, ignore_order, max_differences
+        )
+        self.equal_nan = equal_nan
+        self.check_dtype = check_dtype
+
+        self._array_types = (numpy.ndarray, numpy.generic)
+        if pandas is not None:
+            self._array_types += (pandas.DataFrame, pandas.Series)
+
+    def _mismatches(self, a, b):
+        if a.dtype.kind in _NUMERIC_KINDS and b.dtype.kind in _NUMERIC_KINDS:
+            return ~numpy.isclose(
+                a, b, rtol=self.relative_tolerance, atol=self.tolerance, equal_nan=self.equal_nan
+            )
+
+        mismatches = numpy.broadcast_to(numpy.asarray(a != b, dtype=bool), a.shape)
+        if self.equal_nan and a.dtype.kind == 'O':
+            mismatches = mismatches & ~(numpy.asarray(a != a) & numpy.asarray(b != b))
+        return mismatches
+
+    def _array_differences(self, path, a, b, limit):
+        frames = pandas is not None and (
+            isinstance(a, pandas.DataFrame) and isinstance(b, pandas.DataFrame)
+        )
+        if frames:
+            if list(a.columns) != list(b.columns):
+                return [((path, _Attribute('columns')), list(a.columns), list(b.columns))]
+            differences = []
+            for column in a.columns:
+                differences.extend(self._array_differences(
+                    (path, column), a[column], b[column], limit - len(differences)
+                ))
+                if len(differences) >= limit:
+                    break
+            return differences
+
+        if pandas is not None:
+            if isinstance(a, pandas.Series):
+                a = a.to_numpy()
+            if isinstance(b, pandas.Series):
+                b = b.to_numpy()
+
+        arrays = (numpy.ndarray, numpy.generic)
+        if not isinstance(a, arrays) or not isinstance(b, arrays):
+            return [(path, a, b)]
+
+        a, b = numpy.asarray(a), numpy.asarray(b)
+        if a.shape != b.shape:
+            return [((path, _Attribute('shape')), a.shape, b.shape)]
+        if self.check_dtype and a.dtype != b.dtype:
+            return [((path, _Attribute('dtype')), a.dtype, b.dtype)]
+
+        differing = numpy.flatnonzero(self._mismatches(a, b))[:limit]
+        return [
+            ((path, _Index(int(i) for i in index)), a[index].item(), b[index].item())
+            for index in (numpy.unravel_index(flat, a.shape) for flat in differing)
+        ]
+
+    def _array_pairs(self, a, b):
+        stack = [(None, a, b)]
+
+        while stack:
+            path, a, b = stack.pop()
+            if a is b:
+                continue
+
+            if pandas is not None and (
+                isinstance(a, pandas.DataFrame) and isinstance(b, pandas.DataFrame)
+            ):
+                if list(a.columns) == list(b.columns):
+                    stack.extend(
+                        ((path, column), a[column], b[column]) for column in reversed(a.columns)
+                    )
+            elif isinstance(a, self._array_types) and isinstance(b, self._array_types):
+                yield path, a, b
+            elif isinstance(a, dict) and isinstance(b, dict):
+                stack.extend(
+                    ((path, key), a[key], b[key]) for key in reversed(list(a)) if key in b
+                )
+            elif (
+                isinstance(a, _SEQUENCES) and type(a) is type(b) and len(a) == len(b)
+                and not self.ignore_order
+            ):
+                stack.extend(
+                    ((path, index), a[index], b[index]) for index in range(len(a) - 1, -1, -1)
+                )
+
+    def summaries(self, control, candidate):
+        if control.raised_exception is not None or candidate.raised_exception is not None:
+            return {}
+
+        summaries = {}
+        for path, a, b in self._array_pairs(control.cleaned_value, candidate.cleaned_value):
+            summary = self.summary(a, b)
+            if summary.get('count', 1):
+                summaries[format_path(path)] = summary
+        return summaries
+
+    def summary(self, a, b):
+        a, b = numpy.asarray(a), numpy.asarray(b)
+        if a.shape != b.shape:
+            return {'shape': (a.shape, b.shape)}
+        if self.check_dtype and a.dtype != b.dtype:
+            return {'dtype': (str(a.dtype), str(b.dtype))}
+
+        mismatches = self._mismatches(a, b)
+        differing = numpy.flatnonzero(mismatches)
+
+        max_abs_error = None
+        if len(differing) and a.dtype.kind in _NUMERIC_KINDS and b.dtype.kind in _NUMERIC_KINDS:
+            dtype = numpy.result_type(a.dtype, b.dtype, numpy.float64)
+            errors = numpy.abs(a[mismatches].astype(dtype) - b[mismatches].astype(dtype))
+            if not numpy.isnan(errors).all():
+                max_abs_error = float(numpy.nanmax(errors))
+
+        return {
+            'count': int(len(differing)),
+            'max_abs_error': max_abs_error,
+            'first_indices': [
+                tuple(int(i) for i in numpy.unravel_index(flat, a.shape))
+                for flat in differing[:self.max_differences]
+            ],
+        }
@@ -0,0 +1,67 @@
+import contextvars
+from types import MappingProxyType
+
+EMPTY_CONTEXT = MappingProxyType({})
+
+_defaults = EMPTY_CONTEXT
+_ambient = contextvars.ContextVar('pyentist_context', default=EMPTY_CONTEXT)
+
+
+def set_default_context(**values):
+    global _defaults
+    merged = dict(_defaults)
+    merged.update(values)
+    _defaults = MappingProxyType(merged)
+
+
+def clear_default_context():
+    global _defaults
+    _defaults = EMPTY_CONTEXT
+
+
+class scientist_context(object):
+
+    def __init__(self, **values):
+        self.values = values
+        self._token = None
+
+    def __enter__(self):
+        merged = dict(_ambient.get())
+        merged.update(self.values)
+        context = MappingProxyType(merged)
+        self._token = _ambient.set(context)
+        return context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _ambient.reset(self._token)
+
+
+def current_context():
+    ambient = _ambient.get()
+    if not ambient:
+        return _defaults
+    if not _defaults:
+        return ambient
+
+    merged = dict(_defaults)
+    merged.update(ambient)
+    return MappingProxyType(merged)
+
+
+def lookup(key, default=None):
+    ambient = _ambient.get()
+    if key in ambient:
+        return ambient[key]
+    return _defaults.get(key, default)
+
+
+def capture(experiment_context):
+    ambient = current_context()
+    if not experiment_context:
+        return ambient
+    if not ambient:
+        return MappingProxyType(experiment_context)
+
+    merged = dict(ambient)
+    merged.update(experiment_context)
+    return MappingProxyType(merged)
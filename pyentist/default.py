@@ -1,13 +1,42 @@
+import random
+import zlib
+
 from .experiment import Experiment
+from .asynchronous import AsyncExperiment
+from .context import lookup
+
+
+def sample_bucket(name, key):
+    return zlib.crc32('{}:{}'.format(name, key).encode('utf-8')) % 10000
 
 
 class DefaultExperiment(Experiment):
+    publisher = None
 
-    def __init__(self, name):
-        self.name = name
+    def __init__(self, name, percent=100, sample_key=None):
+        super(DefaultExperiment, self).__init__(name)
+        self.percent = percent
+        self.sample_key = sample_key
 
     def is_enabled(self):
-        return True
+        if self.percent >= 100:
+            return True
+        if self.percent <= 0:
+            return False
+
+        if self.sample_key is not None:
+            key = self.context.get(self.sample_key)
+            if key is None:
+                key = lookup(self.sample_key)
+            if key is not None:
+                return sample_bucket(self.name, key) < self.percent * 100
+
+        return random.random() * 100 < self.percent
 
     def publish(self, result):
-        pass
+        if self.publisher is not None:
+            self.publisher.publish(result)
+
+
+class AsyncDefaultExperiment(DefaultExperiment, AsyncExperiment):
+    pass
@@ -0,0 +1,82 @@
+import functools
+
+from .default import DefaultExperiment
+
+
+class ExperimentDefinition(object):
+
+    def __init__(self, name, control, candidates=None, comparer=None, cleaner=None,
+                 ignorers=(), enabled=True, percent=None, publish=None, context=None,
+                 experiment_class=DefaultExperiment, recorder=None):
+        experiment = experiment_class(name)
+        experiment.use(control)
+
+        if callable(candidates):
+            candidates = {'candidate': candidates}
+        for candidate_name, candidate in (candidates or {}).items():
+            experiment.try_candidate(candidate_name, candidate)
+
+        if comparer is not None:
+            experiment.comparer = comparer
+        if cleaner is not None:
+            experiment.cleaner = cleaner
+        for ignorer in ignorers:
+            experiment.add_ignorer(ignorer)
+        if percent is not None:
+            experiment.percent = percent
+        if publish is not None:
+            experiment.publish = publish
+        if context:
+            experiment.context = context
+        if recorder is not None:
+            experiment.recorder = recorder
+
+        self.experiment = experiment
+        self.control = control
+        self.enabled = enabled
+
+    @property
+    def name(self):
+        return self.experiment.name
+
+    def __call__(self, *args, **kwargs):
+        if not self.enabled:
+            return self.control(*args, **kwargs)
+        return self.experiment.invoke('control', args, kwargs).value()
+
+
+def define(name, control, **options):
+    return ExperimentDefinition(name, control, **options)
+
+
+def experiment(name, candidate=None, candidates=None, **options):
+    def decorator(control):
+        behaviors = dict(candidates or {})
+        if candidate is not None:
+            behaviors['candidate'] = candidate
+
+        definition = ExperimentDefinition(name, control, behaviors, **options)
+        invoke = definition.experiment.invoke
+
+        @functools.wraps(control)
+        def wrapper(*args, **kwargs):
+            if not definition.enabled:
+                return control(*args, **kwargs)
+            return invoke('control', args, kwargs).value()
+
+        def register(candidate_name=None):
+            if callable(candidate_name):
+                definition.experiment.try_candidate(candidate_name.__name__, candidate_name)
+                return candidate_name
+
+            def add(func):
+                definition.experiment.try_candidate(candidate_name or func.__name__, func)
+                return func
+            return add
+
+        wrapper.definition = definition
+        wrapper.experiment = definition.experiment
+        wrapper.candidate = register
+        return wrapper
+
+    return decorator
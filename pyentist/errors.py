@@ -44,3 +44,18 @@ class MismatchError(Exception):
         super(MismatchError, self).__init__(
             "experiment '{}' observations mismatched".format(name)
         )
+
+
+class RecordedError(Exception):
+
+    def __init__(self, name, message):
+        self.name = name
+        self.message = message
+
+        super(RecordedError, self).__init__(
+            "{}: {}".format(name, message)
+        )
+
+    @classmethod
+    def from_exception(cls, exception):
+        return cls(type(exception).__qualname__, str(exception))
@@ -0,0 +1,165 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .observation import Observation
+from . import metrics as resource_metrics
+from .fingerprint import fingerprint
+
+
+def _observe_in_process(callback, cleaner, args, kwargs, metrics=None, fingerprint_value=False,
+                        ship_value=True):
+    measured = digest = cleaner_error = None
+    cleaned = False
+    value = exception = None
+
+    if metrics:
+        state = resource_metrics.start(metrics)
+    started = time.perf_counter_ns()
+
+    try:
+        value = callback(*args, **(kwargs or {}))
+    except Exception as e:
+        exception = e
+
+    duration = (time.perf_counter_ns() - started) / 1e9
+    if metrics:
+        measured = resource_metrics.stop(state)
+
+    if exception is None and cleaner is not None:
+        try:
+            value = cleaner(value)
+            cleaned = True
+        except Exception as e:
+            cleaner_error = e
+
+    if exception is None and fingerprint_value:
+        try:
+            digest = fingerprint(value)
+        except TypeError:
+            pass
+        else:
+            if not ship_value:
+                value = None
+
+    return value, exception, duration, cleaned, measured, digest, cleaner_error
+
+
+class CandidatePool(object):
+    SKIP = 'skip'
+    BLOCK = 'block'
+
+    def __init__(self, max_workers=None, max_pending=None, when_full=SKIP):
+        if when_full not in (CandidatePool.SKIP, CandidatePool.BLOCK):
+            raise ValueError(
+                "when_full must be '{}' or '{}'".format(CandidatePool.SKIP, CandidatePool.BLOCK)
+            )
+
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.when_full = when_full
+        self.skipped = 0
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending) if max_pending else None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._create_executor()
+        return self._executor
+
+    def _create_executor(self):
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def _submit(self, func, *args):
+        return self.executor.submit(contextvars.copy_context().run, func, *args)
+
+    def _release_slot(self, future):
+        self._slots.release()
+
+    def submit(self, func, *args):
+        if self._slots is not None:
+            if not self._slots.acquire(self.when_full == CandidatePool.BLOCK):
+                with self._lock:
+                    self.skipped += 1
+                return None
+
+        try:
+            future = self._submit(func, *args)
+        except Exception:
+            if self._slots is not None:
+                self._slots.release()
+            raise
+
+        if self._slots is not None:
+            future.add_done_callback(self._release_slot)
+        return future
+
+    def observe(self, experiment, name, callback, args=(), kwargs=None, keep_value=False):
+        try:
+            return self.submit(
+                Observation, name, experiment, callback, args, kwargs, experiment.metrics,
+                experiment.fingerprint_values
+            )
+        except Exception as e:
+            experiment.raised('candidate_pool', e)
+            return None
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+class ProcessCandidatePool(CandidatePool):
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def _submit(self, func, *args):
+        return self.executor.submit(func, *args)
+
+    def observe(self, experiment, name, callback, args=(), kwargs=None, keep_value=False):
+        fingerprint_value = experiment.fingerprint_values
+        ship_value = not fingerprint_value or experiment.keep_mismatched_values or keep_value
+        try:
+            future = self.submit(
+                _observe_in_process, callback, experiment.cleaner, args, kwargs,
+                experiment.metrics, fingerprint_value, ship_value
+            )
+        except Exception as e:
+            experiment.raised('candidate_pool', e)
+            return None
+        if future is None:
+            return None
+
+        observed = Future()
+
+        def done(future):
+            # Exceptions raised by the candidate come back in the outcome, so an
+            # exception here means the call or its outcome couldn't be shipped.
+            try:
+                outcome = future.result()
+            except Exception as e:
+                experiment.raised('candidate_pool', e)
+                observed.set_result(None)
+                return
+
+            value, exception, duration, cleaned, measured, digest, cleaner_error = outcome
+            observation = Observation.from_outcome(
+                name, experiment, value, exception, duration, cleaned, metrics=measured,
+                fingerprint=digest, released=digest is not None and not ship_value
+            )
+            if cleaner_error is not None:
+                experiment.raised('cleaner', cleaner_error)
+                observation._cleaned_value = value
+            observed.set_result(observation)
+
+        future.add_done_callback(done)
+        return observed
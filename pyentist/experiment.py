@@ -1,15 +1,66 @@
 import random
+import threading
+import time
+from concurrent.futures import TimeoutError
 
 from .observation import Observation
+from .invocation import Invocation
+from .context import capture
 from .result import Result
-from .errors import BehaviorNotUniqueError, BehaviorMissingError, MismatchError
+from .streams import ObservedStream
+from .comparers import DeepComparer, MISSING
+from .records import encode_binary, decode_binary
+from .errors import (
+    BehaviorNotUniqueError, BehaviorMissingError, MismatchError, RecordedError
+)
+
+_default_comparer = DeepComparer()
+_context_lock = threading.Lock()
 
 
 class Experiment(object):
     raise_on_mismatch = False
 
+    returned_value = None
+    result = None
+    before_run = None
+    cleaner = None
+    comparer = None
+    should_run_callback = None
+    candidate_pool = None
+    background_worker = None
+    candidate_timeout = None
+    overhead_budget = None
+    throttle = None
+    circuit_breaker = None
+    aggregator = None
+    metrics = None
+    fingerprint_values = False
+    keep_mismatched_values = False
+    element_comparer = None
+    stream_window = 100
+    recorder = None
+
+    _should_raise_on_mismatch = None
+
     def __init__(self, name="experiment"):
         self.name = name
+        self.behaviors = {}
+        self.ignorers = []
+        self._context = {}
+
+    def __getattr__(self, name):
+        # Subclasses that don't call Experiment.__init__ get their containers on first use.
+        if name == 'behaviors':
+            self.behaviors = {}
+            return self.behaviors
+        if name == 'ignorers':
+            self.ignorers = []
+            return self.ignorers
+        if name == '_context':
+            self._context = {}
+            return self._context
+        raise AttributeError(name)
 
     def is_enabled(self):
         raise NotImplementedError('Must be implmented in child class')
@@ -19,91 +70,18 @@ class Experiment(object):
 
     @property
     def context(self):
-        if not hasattr(self, '_context'):
-            self._context = {}
         return self._context
 
     @context.setter
     def context(self, new_context):
-        if not hasattr(self, '_context'):
-            self._context = {}
-        self._context.update(new_context or {})
-
-    @property
-    def returned_value(self):
-        if not hasattr(self, '_returned_value'):
-            return
-        return self._returned_value
-
-    @returned_value.setter
-    def returned_value(self, value):
-        self._returned_value = value
-
-    @property
-    def result(self):
-        if not hasattr(self, '_result'):
-            return
-        return self._result
-
-    @result.setter
-    def result(self, value):
-        self._result = value
-
-    @property
-    def before_run(self):
-        if not hasattr(self, '_before_run'):
-            self._before_run = None
-        return self._before_run
-
-    @before_run.setter
-    def before_run(self, func):
-        self._before_run = func
-
-    @property
-    def behaviors(self):
-        if not hasattr(self, '_behaviors'):
-            self._behaviors = {}
-        return self._behaviors
-
-    @property
-    def cleaner(self):
-        if not hasattr(self, '_cleaner'):
-            self._cleaner = None
-        return self._cleaner
-
-    @cleaner.setter
-    def cleaner(self, func):
-        self._cleaner = func
-
-    @property
-    def comparer(self):
-        if not hasattr(self, '_comparer'):
-            self._comparer = None
-        return self._comparer
-
-    @comparer.setter
-    def comparer(self, func):
-        self._comparer = func
-
-    @property
-    def should_run_callback(self):
-        if not hasattr(self, '_should_run_callback'):
-            self._should_run_callback = None
-        return self._should_run_callback
-
-    @should_run_callback.setter
-    def should_run_callback(self, func):
-        self._should_run_callback = func
-
-    @property
-    def ignorers(self):
-        if not hasattr(self, '_ignorers'):
-            self._ignorers = []
-        return self._ignorers
+        with _context_lock:
+            context = dict(self._context)
+            context.update(new_context or {})
+            self._context = context
 
     @property
     def should_raise_on_mismatch(self):
-        if not hasattr(self, '_should_raise_on_mismatch'):
+        if self._should_raise_on_mismatch is None:
             return Experiment.raise_on_mismatch
         return self._should_raise_on_mismatch
 
@@ -113,20 +91,62 @@ class Experiment(object):
 
     def are_observations_equivalent(self, observation1, observation2):
         try:
-            if self.comparer:
+            if self.fingerprint_values:
+                return observation1.is_equivalent_to(observation2)
+            elif self.comparer:
                 return self.comparer(observation1, observation2)
             else:
-                return observation1 == observation2
+                return observation1.is_equivalent_to(observation2)
         except Exception as e:
             self.raised('comparer', e)
             return False
 
+    def are_outcomes_equivalent(self, outcome1, outcome2):
+        value1, exception1 = outcome1
+        value2, exception2 = outcome2
+        if exception1 is not None or exception2 is not None:
+            return (
+                exception1.__class__ == exception2.__class__
+                and str(exception1) == str(exception2)
+            )
+        if value1 is MISSING or value2 is MISSING:
+            return value1 is value2
+
+        try:
+            value1 = self.clean_value(value1)
+            value2 = self.clean_value(value2)
+            if self.element_comparer:
+                return self.element_comparer(value1, value2)
+            return value1 == value2
+        except Exception as e:
+            self.raised('comparer', e)
+            return False
+
+    def observation_differences(self, control, candidate):
+        differ = getattr(self.comparer, 'differences', None) or _default_comparer.differences
+        try:
+            return differ(control, candidate)
+        except Exception as e:
+            self.raised('comparer', e)
+            return []
+
+    def observation_summaries(self, control, candidate):
+        summarize = getattr(self.comparer, 'summaries', None)
+        if summarize is None:
+            return {}
+        try:
+            return summarize(control, candidate)
+        except Exception as e:
+            self.raised('comparer', e)
+            return {}
+
     def should_ignore_mismatched_observation(self, control, candidate):
         if not self.ignorers:
             return False
+        control_value, candidate_value = control.comparable_values(candidate)
         for ignorer in self.ignorers:
             try:
-                if ignorer(control.returned_value, candidate.returned_value):
+                if ignorer(control_value, candidate_value):
                     return True
             except Exception as e:
                 self.raised('ignorer', e)
@@ -141,13 +161,227 @@ class Experiment(object):
                 return False
         return True
 
+    def _can_run_if_throttle_allows(self):
+        if self.throttle:
+            try:
+                return self.throttle.should_run()
+            except Exception as e:
+                self.raised('throttle', e)
+                return False
+        return True
+
     def _should_experiment_run(self):
         try:
-            return len(self.behaviors) > 1 and self.is_enabled() and self._can_run_if_callback_allows()
+            return (
+                len(self.behaviors) > 1
+                and self.is_enabled()
+                and self._can_run_if_callback_allows()
+                and self._can_run_if_throttle_allows()
+            )
+        except Exception as e:
+            self.raised('enabled', e)
+            return False
+
+    def _candidate_allowed(self, name):
+        try:
+            return self.circuit_breaker.allows(name)
+        except Exception as e:
+            self.raised('circuit_breaker', e)
+            return False
+
+    def _should_record(self):
+        try:
+            return self.is_enabled() and self._can_run_if_callback_allows()
         except Exception as e:
             self.raised('enabled', e)
             return False
 
+    def _record_call(self, invocation, duration):
+        try:
+            self.recorder.record(self, invocation, duration)
+        except Exception as e:
+            self.raised('recorder', e)
+
+    def _behaviors_names(self, control_name):
+        names = list(self.behaviors.keys())
+        if self.circuit_breaker:
+            names = [
+                key for key in names
+                if key == control_name or self._candidate_allowed(key)
+            ]
+        random.shuffle(names)
+        return names
+
+    def _observe_serially(self, names, control_name=None, args=(), kwargs=None,
+                          keep_values=False):
+        timeout = self.candidate_timeout
+        budget = self.overhead_budget
+        release = not keep_values and self._releases_candidates_early()
+        spent = 0
+        observations = []
+        control = None
+
+        for key in names:
+            if key != control_name and budget is not None and spent >= budget:
+                observations.append(Observation.from_outcome(key, self, timed_out=True))
+                continue
+
+            observation = Observation(
+                key, self, self.behaviors[key], args, kwargs, self.metrics, self.fingerprint_values
+            )
+
+            if key == control_name:
+                control = observation
+            else:
+                if release:
+                    observation.release()
+                spent += observation.duration
+                if (
+                    (timeout is not None and observation.duration > timeout)
+                    or (budget is not None and spent > budget)
+                ):
+                    observation = Observation.from_outcome(
+                        key, self, duration=observation.duration, timed_out=True
+                    )
+
+            observations.append(observation)
+
+        return observations, control
+
+    def _releases_candidates_early(self):
+        return self.fingerprint_values and not self.keep_mismatched_values and not self.ignorers
+
+    def _observe_candidates(self, names, args=(), kwargs=None, keep_values=False):
+        if not self.candidate_pool:
+            return self._observe_serially(names, None, args, kwargs, keep_values)[0]
+
+        started = time.perf_counter()
+        return self._collect(
+            self._submit_candidates(names, args, kwargs, keep_values), started, started
+        )
+
+    def _submit_candidates(self, names, args=(), kwargs=None, keep_values=False):
+        return [
+            (key, self.candidate_pool.observe(
+                self, key, self.behaviors[key], args, kwargs, keep_values
+            ))
+            for key in names
+        ]
+
+    def _candidates_deadline(self, started, control_finished):
+        deadlines = []
+        if self.candidate_timeout is not None:
+            deadlines.append(started + self.candidate_timeout)
+        if self.overhead_budget is not None:
+            deadlines.append(control_finished + self.overhead_budget)
+        return min(deadlines) if deadlines else None
+
+    def _collect(self, futures, started, control_finished):
+        deadline = self._candidates_deadline(started, control_finished)
+        observations = []
+
+        for name, future in futures:
+            if future is None:
+                continue
+
+            try:
+                if deadline is None:
+                    observation = future.result()
+                else:
+                    observation = future.result(max(deadline - time.perf_counter(), 0))
+            except TimeoutError:
+                future.cancel()
+                observations.append(Observation.from_outcome(
+                    name, self, duration=time.perf_counter() - started, timed_out=True
+                ))
+                continue
+
+            if observation is not None:
+                observations.append(observation)
+
+        return observations
+
+    def _record(self, result):
+        if self.fingerprint_values:
+            result.release_values(self.keep_mismatched_values)
+
+        if self.throttle:
+            try:
+                self.throttle.record(result)
+            except Exception as e:
+                self.raised('throttle', e)
+
+        if self.circuit_breaker:
+            try:
+                self.circuit_breaker.record(result)
+            except Exception as e:
+                self.raised('circuit_breaker', e)
+
+        if self.aggregator:
+            try:
+                self.aggregator.record(result)
+            except Exception as e:
+                self.raised('aggregator', e)
+
+    def _publish(self, result):
+        self._record(result)
+
+        try:
+            self.publish(result)
+        except Exception as e:
+            self.raised('publish', e)
+
+    def _complete_in_background(self, invocation):
+        control = invocation.control
+        names = [key for key in self._behaviors_names(invocation.name) if key != invocation.name]
+
+        observations = [control]
+        observations.extend(self._observe_candidates(names, invocation.args, invocation.kwargs))
+        invocation.result = Result(self, observations, control, invocation.context)
+        self._publish(invocation.result)
+
+    def replay(self, record):
+        name = record['behavior']
+        exception = record.get('exception')
+        if exception is not None:
+            control = Observation.from_outcome(
+                name, self, raised_exception=RecordedError(*exception),
+                duration=record['duration']
+            )
+        else:
+            control = Observation.from_outcome(
+                name, self, record['value'], duration=record['duration'], cleaned=True
+            )
+
+        names = [key for key in self._behaviors_names(name) if key != name]
+        observations = [control]
+        for candidate in self._observe_candidates(
+            names, record.get('args', ()), record.get('kwargs'), keep_values=True
+        ):
+            if not candidate.timed_out:
+                candidate = self._as_recorded(candidate)
+            observations.append(candidate)
+
+        if self.fingerprint_values:
+            for observation in observations:
+                observation.take_fingerprint()
+
+        result = Result(self, observations, control, record.get('context'))
+        self._publish(result)
+        return result
+
+    def _as_recorded(self, observation):
+        if observation.raised_exception is not None:
+            return Observation.from_outcome(
+                observation.name, self,
+                raised_exception=RecordedError.from_exception(observation.raised_exception),
+                duration=observation.duration, metrics=observation.metrics
+            )
+        return Observation.from_outcome(
+            observation.name, self, decode_binary(encode_binary(observation.cleaned_value)),
+            duration=observation.duration, cleaned=True, metrics=observation.metrics
+        )
+
     def try_candidate(self, name='candidate', callback=None):
         if not callback and hasattr(name, '__call__'):
             callback = name
@@ -164,49 +398,97 @@ class Experiment(object):
     def use(self, callback):
         self.try_candidate('control', callback)
 
-    def run(self, name='control'):
+    def run(self, name='control', args=(), kwargs=None):
+        invocation = self.invoke(name, args, kwargs)
+        self.result = invocation.result
+
+        if invocation.raised_exception is not None:
+            raise invocation.raised_exception
+        else:
+            self.returned_value = invocation.returned_value
+            return self.returned_value
+
+    def invoke(self, name='control', args=(), kwargs=None):
         callback = self.behaviors.get(name, None)
         if not callback:
             raise BehaviorMissingError(self, name)
 
-        if not self._should_experiment_run():
-            return callback()
+        if self.recorder and self._should_record():
+            invocation = Invocation(self, name, args, kwargs)
+            invocation.context = capture(self._context)
+            control = Observation(name, self, callback, args, kwargs)
+            invocation.observed(control)
+            self._record_call(invocation, control.duration)
+            return invocation
+
+        if self.recorder or not self._should_experiment_run():
+            invocation = Invocation(self, name, args, kwargs)
+            invocation.call(callback)
+            return invocation
+
+        invocation = Invocation(self, name, args, kwargs)
+        invocation.context = capture(self._context)
 
         if self.before_run:
             self.before_run()
 
-        observations = []
+        if self.background_worker:
+            invocation.observed(Observation(
+                name, self, callback, args, kwargs, self.metrics, self.fingerprint_values
+            ))
+            self.background_worker.submit(self._complete_in_background, invocation)
+        else:
+            self._observe(invocation, callback)
 
-        behaviors_names = list(self.behaviors.keys())
-        random.shuffle(behaviors_names)
-        for key in behaviors_names:
-            callback = self.behaviors[key]
-            observations.append(Observation(key, self, callback))
-
-        control = next(
-            (
-                observation
-                for observation in observations
-                if observation.name == name
-            ),
-            None
-        )
+        return invocation
 
-        self.result = Result(self, observations, control)
+    def run_stream(self, name='control', args=(), kwargs=None):
+        callback = self.behaviors.get(name, None)
+        if not callback:
+            raise BehaviorMissingError(self, name)
 
-        try:
-            self.publish(self.result)
-        except Exception as e:
-            self.raised('publish', e)
+        if not self._should_experiment_run():
+            if kwargs:
+                return callback(*args, **kwargs)
+            return callback(*args)
 
-        if self.should_raise_on_mismatch and self.result.was_mismatched:
-            raise MismatchError(self.name, self.result)
+        context = capture(self._context)
 
-        if control.raised_exception:
-            raise control.raised_exception
+        if self.before_run:
+            self.before_run()
+
+        stream = ObservedStream(self, name, callback, args, kwargs, context)
+        if stream.control.raised_exception is not None:
+            stream._raise_on_mismatch()
+            raise stream.control.raised_exception
+        return stream
+
+    def _observe(self, invocation, callback):
+        name = invocation.name
+        args = invocation.args
+        kwargs = invocation.kwargs
+        behaviors_names = self._behaviors_names(name)
+
+        if self.candidate_pool:
+            started = time.perf_counter()
+            futures = self._submit_candidates(
+                (key for key in behaviors_names if key != name), args, kwargs
+            )
+            control = Observation(
+                name, self, callback, args, kwargs, self.metrics, self.fingerprint_values
+            )
+            observations = [control]
+            observations.extend(self._collect(futures, started, time.perf_counter()))
         else:
-            self.returned_value = control.returned_value
-            return self.returned_value
+            observations, control = self._observe_serially(behaviors_names, name, args, kwargs)
+
+        result = Result(self, observations, control, invocation.context)
+        invocation.observed(control)
+        invocation.result = result
+        self._publish(result)
+
+        if self.should_raise_on_mismatch and result.was_mismatched:
+            raise MismatchError(self.name, result)
 
     def add_ignorer(self, func):
         self.ignorers.append(func)
@@ -0,0 +1,116 @@
+import hashlib
+import math
+import struct
+
+_FLOAT = struct.Struct('>d')
+_INTS = set([int])
+_SORTABLE_KEYS = (set([str]), set([int]))
+_CHUNK = 4096
+
+
+def _packs_ints(values):
+    return (
+        values and set(map(type, values)) == _INTS
+        and -2 ** 63 <= min(values) and max(values) < 2 ** 63
+    )
+
+
+def _update_ints(update, values):
+    for start in range(0, len(values), _CHUNK):
+        chunk = values[start:start + _CHUNK]
+        update(struct.pack('<%dq' % len(chunk), *chunk))
+
+
+def _sort_key(item):
+    return fingerprint(item[0], raw=True)
+
+
+def _type_name(value_type):
+    return '{}.{}'.format(value_type.__module__, value_type.__qualname__).encode('utf-8')
+
+
+def _update(hasher, value):
+    update = hasher.update
+    stack = [value]
+
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+
+        if value is None:
+            update(b'N')
+        elif value_type is bool:
+            update(b'T' if value else b'F')
+        elif value_type is int:
+            update(b'i%d;' % value)
+        elif value_type is float:
+            if math.isnan(value):
+                update(b'n')
+            else:
+                # Adding 0.0 turns -0.0 into 0.0, which it is equal to.
+                update(b'd' + _FLOAT.pack(value + 0.0))
+        elif value_type is str:
+            data = value.encode('utf-8', 'surrogatepass')
+            update(b's%d:' % len(data))
+            update(data)
+        elif isinstance(value, (bytes, bytearray)):
+            update(b'b%d:' % len(value))
+            update(value)
+        elif isinstance(value, (list, tuple)):
+            update((b'l%d:' if isinstance(value, list) else b't%d:') % len(value))
+            if _packs_ints(value):
+                update(b'q')
+                _update_ints(update, value)
+            else:
+                stack.extend(reversed(value))
+        elif isinstance(value, dict):
+            if set(map(type, value)) in _SORTABLE_KEYS:
+                items = sorted(value.items())
+            else:
+                items = sorted(value.items(), key=_sort_key)
+            update(b'm%d:' % len(items))
+            for key, item in reversed(items):
+                stack.append(item)
+                stack.append(key)
+        elif isinstance(value, (set, frozenset)):
+            update(b'S%d:' % len(value))
+            for digest in sorted(fingerprint(item, raw=True) for item in value):
+                update(digest)
+        else:
+            try:
+                view = memoryview(value)
+            except TypeError:
+                view = None
+
+            if view is not None:
+                _update_buffer(update, value, view)
+                continue
+
+            attributes = getattr(value, '__dict__', None)
+            if attributes is None:
+                raise TypeError("can't fingerprint {} values".format(value_type.__qualname__))
+
+            name = _type_name(value_type)
+            update(b'o%d:' % len(name))
+            update(name)
+            stack.append(attributes)
+
+
+def _update_buffer(update, value, view):
+    if 'O' in view.format:
+        raise TypeError("can't fingerprint buffers of objects")
+
+    dtype = getattr(value, 'dtype', None)
+    header = '{}:{}:{}'.format(view.format, view.shape, getattr(dtype, 'str', ''))
+    header = _type_name(type(value)) + b'|' + header.encode('utf-8')
+    update(b'v%d:%d:' % (len(header), view.nbytes))
+    update(header)
+    update(view if view.c_contiguous else view.tobytes())
+
+
+def fingerprint(value, raw=False):
+    hasher = hashlib.blake2b(digest_size=16)
+    _update(hasher, value)
+    if raw:
+        return hasher.digest()
+    return hasher.hexdigest()
@@ -0,0 +1,35 @@
+class Invocation(object):
+    __slots__ = (
+        'experiment', 'name', 'args', 'kwargs', 'context', 'control', 'result',
+        'returned_value', 'raised_exception',
+    )
+
+    def __init__(self, experiment, name='control', args=(), kwargs=None):
+        self.experiment = experiment
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+        self.context = None
+        self.control = None
+        self.result = None
+        self.returned_value = None
+        self.raised_exception = None
+
+    def call(self, callback):
+        try:
+            if self.kwargs:
+                self.returned_value = callback(*self.args, **self.kwargs)
+            else:
+                self.returned_value = callback(*self.args)
+        except Exception as e:
+            self.raised_exception = e
+
+    def observed(self, control):
+        self.control = control
+        self.returned_value = control.returned_value
+        self.raised_exception = control.raised_exception
+
+    def value(self):
+        if self.raised_exception is not None:
+            raise self.raised_exception
+        return self.returned_value
@@ -0,0 +1,82 @@
+import gc
+import threading
+import time
+import tracemalloc
+
+CPU = 'cpu'
+MEMORY = 'memory'
+GC = 'gc'
+
+_reset_peak = getattr(tracemalloc, 'reset_peak', None)
+
+_lock = threading.Lock()
+_measuring = 0
+_started_tracing = False
+
+
+def _collections():
+    return sum(generation['collections'] for generation in gc.get_stats())
+
+
+def _start_tracing():
+    global _measuring, _started_tracing
+
+    with _lock:
+        if not _measuring and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+
+        # The peak is process-wide, so it is only reset, and reported, for a
+        # measurement that starts while no other one is running.
+        alone = not _measuring and _reset_peak is not None
+        if alone:
+            _reset_peak()
+        _measuring += 1
+        return tracemalloc.get_traced_memory()[0], alone
+
+
+def _stop_tracing():
+    global _measuring, _started_tracing
+
+    with _lock:
+        current, peak = tracemalloc.get_traced_memory()
+        _measuring -= 1
+        if not _measuring and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+        return current, peak
+
+
+def start(metrics):
+    cpu = memory = collections = None
+
+    if GC in metrics:
+        collections = _collections()
+
+    if MEMORY in metrics:
+        memory = _start_tracing()
+
+    if CPU in metrics:
+        cpu = time.thread_time_ns()
+
+    return cpu, memory, collections
+
+
+def stop(state):
+    cpu, memory, collections = state
+    measured = {}
+
+    if cpu is not None:
+        measured['cpu_ns'] = time.thread_time_ns() - cpu
+
+    if memory is not None:
+        baseline, alone = memory
+        current, peak = _stop_tracing()
+        measured['allocated_bytes'] = current - baseline
+        if alone:
+            measured['peak_bytes'] = peak - baseline
+
+    if collections is not None:
+        measured['gc_collections'] = _collections() - collections
+
+    return measured
@@ -1,23 +1,91 @@
 import time
 
+from . import metrics as resource_metrics
+from .fingerprint import fingerprint
+
+_NOT_CLEANED = object()
+
 
 class Observation(object):
+    __slots__ = (
+        'name', 'experiment', 'callback', 'now', 'duration', 'duration_ns', 'started_ns',
+        'timed_out', 'returned_value', 'raised_exception', 'metrics', 'fingerprint', 'released',
+        'value_cleaned', '_cleaned_value',
+    )
 
-    def __init__(self, name, experiment, callback):
+    def __init__(self, name, experiment, callback, args=(), kwargs=None, metrics=None,
+                 fingerprint=False):
         self.name = name
         self.experiment = experiment
         self.callback = callback
+        self.timed_out = False
+        self.returned_value = None
+        self.raised_exception = None
+        self._cleaned_value = _NOT_CLEANED
+        self.value_cleaned = False
+        self.metrics = None
+        self.fingerprint = None
+        self.released = False
+
+        if metrics:
+            state = resource_metrics.start(metrics)
+
         self.now = time.time()
+        self.started_ns = time.perf_counter_ns()
 
         try:
-            self._returned_value = self.callback()
+            if kwargs:
+                self.returned_value = callback(*args, **kwargs)
+            else:
+                self.returned_value = callback(*args)
         except Exception as e:
-            self._raised_exception = e
+            self.raised_exception = e
+
+        self.duration_ns = time.perf_counter_ns() - self.started_ns
+        self.duration = self.duration_ns / 1e9
+
+        if metrics:
+            self.metrics = resource_metrics.stop(state)
+
+        if fingerprint:
+            self.take_fingerprint()
 
-        self.duration = time.time() - self.now
+    @classmethod
+    def from_outcome(cls, name, experiment, returned_value=None, raised_exception=None,
+                     duration=None, cleaned=False, timed_out=False, metrics=None,
+                     fingerprint=None, released=False):
+        observation = cls.__new__(cls)
+        observation.name = name
+        observation.experiment = experiment
+        observation.callback = None
+        observation.now = None
+        observation.started_ns = None
+        observation.duration = duration
+        observation.duration_ns = None if duration is None else int(duration * 1e9)
+        observation.timed_out = timed_out
+        observation.metrics = metrics
+        observation.fingerprint = fingerprint
+        observation.released = released
+        observation.returned_value = None
+        observation.raised_exception = None
+        observation._cleaned_value = _NOT_CLEANED
+        observation.value_cleaned = False
+
+        if timed_out:
+            return observation
+
+        if raised_exception is not None:
+            observation.raised_exception = raised_exception
+        else:
+            observation.returned_value = returned_value
+            if cleaned:
+                observation._cleaned_value = returned_value
+                observation.value_cleaned = True
+
+        return observation
 
     def __hash__(self):
-        return sum(map(hash, [self.returned_value, self.raised_exception, self.__class__]))
+        return hash((self.returned_value, self.raised_exception, self.__class__))
 
     def is_equivalent_to(self, other, comparer=None):
         if not isinstance(other, Observation):
@@ -28,10 +96,13 @@ class Observation(object):
         neither_raised = not self.raised_exception and not other.raised_exception
 
         if neither_raised:
+            if self.fingerprint is not None and other.fingerprint is not None:
+                return self.fingerprint == other.fingerprint
+            value, other_value = self.comparable_values(other)
             if comparer:
-                values_are_equal = comparer(self.returned_value, other.returned_value)
+                values_are_equal = comparer(value, other_value)
             else:
-                values_are_equal = self.returned_value == other.returned_value
+                values_are_equal = value == other_value
             return values_are_equal
         elif both_raised:
             return (
@@ -40,19 +111,30 @@ class Observation(object):
             )
         return False
 
-    @property
-    def raised_exception(self):
-        if not hasattr(self, '_raised_exception'):
-            return None
-        return self._raised_exception
+    def comparable_values(self, other):
+        if self.value_cleaned or other.value_cleaned:
+            return self.cleaned_value, other.cleaned_value
+        return self.returned_value, other.returned_value
 
-    @property
-    def returned_value(self):
-        if not hasattr(self, '_returned_value'):
+    def take_fingerprint(self):
+        if self.raised_exception is None and not self.timed_out:
+            try:
+                self.fingerprint = fingerprint(self.cleaned_value)
+            except TypeError:
+                self.fingerprint = None
+
+    def release(self):
+        if self.fingerprint is None and self.raised_exception is None and not self.timed_out:
             return
-        return self._returned_value
+        self.returned_value = None
+        self._cleaned_value = _NOT_CLEANED
+        self.released = True
 
     @property
     def cleaned_value(self):
-        if self.returned_value:
-            return self.experiment.clean_value(self.returned_value)
+        if self._cleaned_value is not _NOT_CLEANED:
+            return self._cleaned_value
+        if self.returned_value is None:
+            return None
+        self._cleaned_value = self.experiment.clean_value(self.returned_value)
+        return self._cleaned_value
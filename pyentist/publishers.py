@@ -0,0 +1,172 @@
+import collections
+import threading
+import time
+
+from .records import RecordWriter
+
+
+class BatchingPublisher(object):
+    DROP_NEWEST = 'drop_newest'
+    DROP_OLDEST = 'drop_oldest'
+    BLOCK = 'block'
+
+    def __init__(self, max_batch=100, max_age=1.0, max_buffer=10000,
+                 overflow=DROP_NEWEST, block_timeout=None, evaluate=False):
+        if overflow not in (
+            BatchingPublisher.DROP_NEWEST, BatchingPublisher.DROP_OLDEST, BatchingPublisher.BLOCK
+        ):
+            raise ValueError(
+                "overflow must be '{}', '{}' or '{}'".format(
+                    BatchingPublisher.DROP_NEWEST, BatchingPublisher.DROP_OLDEST,
+                    BatchingPublisher.BLOCK
+                )
+            )
+
+        self.max_batch = max_batch
+        self.max_age = max_age
+        self.max_buffer = max_buffer
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.evaluate = evaluate
+
+        self.published = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+        self._buffer = collections.deque()
+        self._in_flight = 0
+        self._flushes = 0
+        self._closed = False
+        self._thread = None
+        self._condition = threading.Condition()
+
+    def publish_batch(self, results):
+        raise NotImplementedError('Must be implmented in child class')
+
+    def publish(self, result):
+        if self.evaluate and result.mismatched:
+            result.differences
+            result.summaries
+
+        with self._condition:
+            if self._closed:
+                self.dropped += 1
+                return False
+
+            if len(self._buffer) >= self.max_buffer:
+                if self.overflow == BatchingPublisher.DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                elif self.overflow == BatchingPublisher.DROP_OLDEST:
+                    self._buffer.popleft()
+                    self.dropped += 1
+                elif not self._condition.wait_for(
+                    lambda: len(self._buffer) < self.max_buffer or self._closed,
+                    self.block_timeout
+                ) or self._closed:
+                    self.dropped += 1
+                    return False
+
+            self._buffer.append((time.monotonic(), result))
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._work, name='pyentist-publisher', daemon=True
+                )
+                self._thread.start()
+
+            if len(self._buffer) == 1 or len(self._buffer) >= self.max_batch:
+                self._condition.notify_all()
+        return True
+
+    __call__ = publish
+
+    def _batch_is_due(self):
+        if not self._buffer:
+            return False
+        return (
+            len(self._buffer) >= self.max_batch
+            or self._closed
+            or self._flushes
+            or time.monotonic() - self._buffer[0][0] >= self.max_age
+        )
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._batch_is_due():
+                    if self._closed and not self._buffer:
+                        return
+                    timeout = None
+                    if self._buffer:
+                        timeout = self.max_age - (time.monotonic() - self._buffer[0][0])
+                    self._condition.wait(timeout)
+
+                count = min(len(self._buffer), self.max_batch)
+                batch = [self._buffer.popleft()[1] for _ in range(count)]
+                self._in_flight += 1
+                self._condition.notify_all()
+
+            failed = False
+            try:
+                self.publish_batch(batch)
+            except Exception:
+                failed = True
+
+            with self._condition:
+                self._in_flight -= 1
+                self.batches += 1
+                if failed:
+                    self.failed += len(batch)
+                else:
+                    self.published += len(batch)
+                self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        with self._condition:
+            self._flushes += 1
+            self._condition.notify_all()
+            try:
+                return self._condition.wait_for(
+                    lambda: not self._buffer and not self._in_flight, timeout
+                )
+            finally:
+                self._flushes -= 1
+
+    def shutdown(self, wait=True, timeout=None):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+
+        if wait and thread is not None:
+            thread.join(timeout)
+
+
+class StreamPublisher(BatchingPublisher):
+
+    def __init__(self, stream, binary=False, max_value_size=256, **options):
+        super(StreamPublisher, self).__init__(**options)
+        self.stream = stream
+        self.writer = RecordWriter(stream, binary, max_value_size)
+
+    def publish_batch(self, results):
+        self.writer.write_results(results)
+        self.writer.flush()
+
+
+class FilePublisher(StreamPublisher):
+
+    def __init__(self, path, binary=False, **options):
+        if binary:
+            stream = open(path, 'ab')
+        else:
+            stream = open(path, 'a', encoding='utf-8')
+        super(FilePublisher, self).__init__(stream, binary, **options)
+        self.path = path
+
+    def shutdown(self, wait=True, timeout=None):
+        super(FilePublisher, self).shutdown(wait, timeout)
+        if wait:
+            self.stream.close()
@@ -0,0 +1,113 @@
+import mmap
+import os
+import re
+
+from .publishers import BatchingPublisher
+from .records import VERSION, encode_binary, encodes_exactly, iter_frames
+
+
+def _segments(directory, prefix):
+    pattern = re.compile(r'^{}-\d+\.log$'.format(re.escape(prefix)))
+    names = [name for name in os.listdir(directory) if pattern.match(name)]
+    return [os.path.join(directory, name) for name in sorted(names)]
+
+
+def to_call_record(experiment, invocation, duration):
+    record = {
+        'version': VERSION,
+        'experiment': experiment.name,
+        'behavior': invocation.name,
+        'context': dict(invocation.context or {}),
+        'args': list(invocation.args),
+        'kwargs': dict(invocation.kwargs or {}),
+        'duration': duration,
+    }
+
+    exception = invocation.raised_exception
+    if exception is not None:
+        record['exception'] = [type(exception).__qualname__, str(exception)]
+    else:
+        record['value'] = experiment.clean_value(invocation.returned_value)
+    return record
+
+
+class Recorder(BatchingPublisher):
+
+    def __init__(self, directory, prefix='calls', max_segment_size=64 * 1024 * 1024, **options):
+        super(Recorder, self).__init__(**options)
+        self.directory = directory
+        self.prefix = prefix
+        self.max_segment_size = max_segment_size
+        self.segment = None
+
+        existing = self.segments()
+        self._sequence = max(
+            [int(os.path.basename(segment)[len(prefix) + 1:-4]) for segment in existing] or [0]
+        )
+        self._stream = None
+        self._size = 0
+
+    def record(self, experiment, invocation, duration):
+        if not (encodes_exactly(invocation.args) and encodes_exactly(invocation.kwargs or {})):
+            with self._condition:
+                self.dropped += 1
+            raise ValueError(
+                "Can't record the arguments of '{}' exactly".format(experiment.name)
+            )
+        return self.publish((experiment, invocation, duration))
+
+    def segments(self):
+        return _segments(self.directory, self.prefix)
+
+    def _rotate(self):
+        if self._stream is not None:
+            self._stream.close()
+        self._sequence += 1
+        self.segment = os.path.join(
+            self.directory, '{}-{:08d}.log'.format(self.prefix, self._sequence)
+        )
+        self._stream = open(self.segment, 'ab')
+        self._size = 0
+
+    def publish_batch(self, calls):
+        chunk = []
+        for experiment, invocation, duration in calls:
+            frame = encode_binary(to_call_record(experiment, invocation, duration))
+            if self._stream is None or (
+                self._size and self._size + len(frame) > self.max_segment_size
+            ):
+                if chunk:
+                    self._stream.write(b''.join(chunk))
+                    chunk = []
+                self._rotate()
+            chunk.append(frame)
+            self._size += len(frame)
+
+        if chunk:
+            self._stream.write(b''.join(chunk))
+        self._stream.flush()
+
+    def shutdown(self, wait=True, timeout=None):
+        super(Recorder, self).shutdown(wait, timeout)
+        if wait and self._stream is not None:
+            self._stream.close()
+
+
+def read_segment(path):
+    with open(path, 'rb') as stream:
+        if not os.fstat(stream.fileno()).st_size:
+            return
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for record in iter_frames(data):
+                yield record
+
+
+def iter_calls(path, prefix='calls'):
+    if not os.path.isdir(path):
+        for record in read_segment(path):
+            yield record
+        return
+
+    for segment in _segments(path, prefix):
+        for record in read_segment(segment):
+            yield record
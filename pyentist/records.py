@@ -0,0 +1,275 @@
+import hashlib
+import json
+import struct
+
+VERSION = 1
+
+CONTROL = 'control'
+MATCHED = 'matched'
+MISMATCHED = 'mismatched'
+IGNORED = 'ignored'
+TIMED_OUT = 'timed_out'
+
+_FRAME = struct.Struct('>BI')
+_INT = struct.Struct('>q')
+_FLOAT = struct.Struct('>d')
+_SIZE = struct.Struct('>I')
+
+
+def digest(data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _status(result, observation, mismatched, ignored):
+    if observation is result.control:
+        return CONTROL
+    if observation.timed_out:
+        return TIMED_OUT
+    if id(observation) in ignored:
+        return IGNORED
+    if id(observation) in mismatched:
+        return MISMATCHED
+    return MATCHED
+
+
+def _value(observation, max_value_size):
+    value = observation.cleaned_value
+
+    try:
+        encoded = json.dumps(value, separators=(',', ':'))
+    except (TypeError, ValueError):
+        encoded = repr(value)
+    else:
+        if len(encoded) <= max_value_size:
+            return 'value', value
+
+    return 'digest', digest(encoded)
+
+
+def to_record(result, max_value_size=256):
+    mismatched = set(id(candidate) for candidate in result.mismatched)
+    ignored = set(id(candidate) for candidate in result.ignored)
+    aggregator = result.experiment.aggregator
+
+    observations = []
+    for observation in result.observations:
+        entry = {
+            'name': observation.name,
+            'status': _status(result, observation, mismatched, ignored),
+            'duration': observation.duration,
+        }
+
+        if observation.metrics:
+            entry['metrics'] = observation.metrics
+
+        exception = observation.raised_exception
+        if exception is not None:
+            entry['exception'] = [type(exception).__qualname__, str(exception)]
+        elif observation.released:
+            entry['digest'] = observation.fingerprint
+        elif not observation.timed_out:
+            key, value = _value(observation, max_value_size)
+            entry[key] = value
+
+        diverged_at = getattr(observation, 'diverged_at', None)
+        if diverged_at is not None:
+            entry['diverged_at'] = diverged_at
+
+        if entry['status'] == MISMATCHED:
+            entry['differences'] = [
+                path for path, _, _ in result.differences.get(observation.name, ())
+            ]
+            summaries = result.summaries.get(observation.name)
+            if summaries:
+                entry['summaries'] = summaries
+
+        if aggregator is not None and observation is not result.control:
+            entry['latency_verdict'] = aggregator.verdict(
+                result.experiment_name, observation.name
+            )
+
+        observations.append(entry)
+
+    return {
+        'version': VERSION,
+        'experiment': result.experiment_name,
+        'context': dict(result.context),
+        'observations': observations,
+    }
+
+
+def encode_json(record):
+    return json.dumps(record, default=repr, separators=(',', ':')) + '\n'
+
+
+def decode_json(line):
+    return json.loads(line)
+
+
+def _encode(value, out):
+    if value is None:
+        out.append(b'N')
+    elif value is True:
+        out.append(b'T')
+    elif value is False:
+        out.append(b'F')
+    elif isinstance(value, int) and -2 ** 63 <= value < 2 ** 63:
+        out.append(b'i')
+        out.append(_INT.pack(value))
+    elif isinstance(value, float):
+        out.append(b'd')
+        out.append(_FLOAT.pack(value))
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(b'b')
+        out.append(_SIZE.pack(len(value)))
+        out.append(bytes(value))
+    elif isinstance(value, (list, tuple)):
+        out.append(b'u' if isinstance(value, tuple) else b'l')
+        out.append(_SIZE.pack(len(value)))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out.append(b'm')
+        out.append(_SIZE.pack(len(value)))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    else:
+        if not isinstance(value, str):
+            value = repr(value)
+        data = value.encode('utf-8')
+        out.append(b's')
+        out.append(_SIZE.pack(len(data)))
+        out.append(data)
+
+
+def _decode(data, offset):
+    tag = data[offset]
+    offset += 1
+
+    if tag == 0x4e:  # N
+        return None, offset
+    elif tag == 0x54:  # T
+        return True, offset
+    elif tag == 0x46:  # F
+        return False, offset
+    elif tag == 0x69:  # i
+        return _INT.unpack_from(data, offset)[0], offset + 8
+    elif tag == 0x64:  # d
+        return _FLOAT.unpack_from(data, offset)[0], offset + 8
+
+    size = _SIZE.unpack_from(data, offset)[0]
+    offset += 4
+
+    if tag == 0x73:  # s
+        return str(data[offset:offset + size], 'utf-8'), offset + size
+    elif tag == 0x62:  # b
+        return bytes(data[offset:offset + size]), offset + size
+    elif tag == 0x6c or tag == 0x75:  # l, u
+        items = []
+        for _ in range(size):
+            item, offset = _decode(data, offset)
+            items.append(item)
+        return (tuple(items) if tag == 0x75 else items), offset
+    elif tag == 0x6d:  # m
+        items = {}
+        for _ in range(size):
+            key, offset = _decode(data, offset)
+            items[key], offset = _decode(data, offset)
+        return items, offset
+
+    raise ValueError('Unknown tag {!r} in record'.format(chr(tag)))
+
+
+def encodes_exactly(value):
+    kind = type(value)
+    if value is None or kind in (bool, float, str, bytes):
+        return True
+    if kind is int:
+        return -2 ** 63 <= value < 2 ** 63
+    if kind in (list, tuple):
+        return all(encodes_exactly(item) for item in value)
+    if kind is dict:
+        return all(encodes_exactly(key) and encodes_exactly(item) for key, item in value.items())
+    return False
+
+
+def encode_binary(record):
+    out = []
+    _encode(record, out)
+    payload = b''.join(out)
+    return _FRAME.pack(VERSION, len(payload)) + payload
+
+
+def decode_binary(frame):
+    version, size = _FRAME.unpack_from(frame)
+    if version != VERSION:
+        raise ValueError('Unsupported record version {}'.format(version))
+    return _decode(memoryview(frame)[_FRAME.size:_FRAME.size + size], 0)[0]
+
+
+class RecordWriter(object):
+
+    def __init__(self, stream, binary=False, max_value_size=256):
+        self.stream = stream
+        self.binary = binary
+        self.max_value_size = max_value_size
+        self.encode = encode_binary if binary else encode_json
+
+    def encode_result(self, result):
+        return self.encode(to_record(result, self.max_value_size))
+
+    def write(self, record):
+        self.stream.write(self.encode(record))
+
+    def write_results(self, results):
+        empty = b'' if self.binary else ''
+        self.stream.write(empty.join([self.encode_result(result) for result in results]))
+
+    def flush(self):
+        self.stream.flush()
+
+
+def iter_records(stream, binary=False):
+    if not binary:
+        for line in stream:
+            if line.strip():
+                yield decode_json(line)
+        return
+
+    while True:
+        header = stream.read(_FRAME.size)
+        if not header:
+            return
+        if len(header) < _FRAME.size:
+            raise ValueError('Truncated record header')
+
+        version, size = _FRAME.unpack(header)
+        if version != VERSION:
+            raise ValueError('Unsupported record version {}'.format(version))
+
+        payload = stream.read(size)
+        if len(payload) < size:
+            raise ValueError('Truncated record')
+        yield _decode(memoryview(payload), 0)[0]
+
+
+def iter_frames(data):
+    offset = 0
+    end = len(data)
+
+    while offset < end:
+        if end - offset < _FRAME.size:
+            raise ValueError('Truncated record header')
+
+        version, size = _FRAME.unpack_from(data, offset)
+        if version != VERSION:
+            raise ValueError('Unsupported record version {}'.format(version))
+
+        offset += _FRAME.size
+        if end - offset < size:
+            raise ValueError('Truncated record')
+        yield _decode(data, offset)[0]
+        offset += size
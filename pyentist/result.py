@@ -1,23 +1,65 @@
 class Result(object):
+    __slots__ = (
+        'experiment', 'observations', 'control', 'candidates', 'timed_out',
+        '_context', '_ignored', '_mismatched', '_differences', '_summaries',
+    )
 
-    def __init__(self, experiment, observations=(), control=None):
-        super(Result, self).__init__()
-
+    def __init__(self, experiment, observations=(), control=None, context=None):
         self.experiment = experiment
+        self._context = context
         self.observations = observations
         self.control = control
         if control:
-            self.candidates = tuple(o for o in observations if o != control)
+            self.candidates = tuple([o for o in observations if o is not control])
         else:
-            self.candidates = tuple(observations[:])
-        self.ignored = []
-        self.mismatched = []
+            self.candidates = tuple(observations)
+        self.timed_out = tuple([o for o in self.candidates if o.timed_out])
+        self._ignored = None
+        self._mismatched = None
+        self._differences = None
+        self._summaries = None
+
+    @property
+    def ignored(self):
+        if self._ignored is None:
+            self.evaluate_candidates()
+        return self._ignored
+
+    @property
+    def mismatched(self):
+        if self._mismatched is None:
+            self.evaluate_candidates()
+        return self._mismatched
+
+    @property
+    def differences(self):
+        if self._differences is None:
+            self._differences = dict(
+                (candidate.name, self.experiment.observation_differences(self.control, candidate))
+                for candidate in self.mismatched
+            )
+        return self._differences
 
-        self.evaluate_candidates()
+    @property
+    def summaries(self):
+        if self._summaries is None:
+            summaries = {}
+            for candidate in self.mismatched:
+                summary = self.experiment.observation_summaries(self.control, candidate)
+                if summary:
+                    summaries[candidate.name] = summary
+            self._summaries = summaries
+        return self._summaries
+
+    @property
+    def was_evaluated(self):
+        return self._mismatched is not None
 
     @property
     def context(self):
-        return self.experiment.context
+        if self._context is None:
+            return self.experiment.context
+        return self._context
 
     @property
     def experiment_name(self):
@@ -35,17 +77,35 @@ class Result(object):
     def was_ignored(self):
         return bool(self.ignored)
 
+    @property
+    def was_timed_out(self):
+        return bool(self.timed_out)
+
+    def release_values(self, keep_mismatched=False):
+        mismatched = self.mismatched
+        for observation in self.observations:
+            if keep_mismatched and mismatched and (
+                observation is self.control or observation in mismatched
+            ):
+                continue
+            observation.release()
+
     def evaluate_candidates(self):
-        mismatched = tuple(
+        mismatched = tuple([
             candidate
             for candidate in self.candidates
-            if not self.experiment.are_observations_equivalent(self.control, candidate)
-        )
+            if not candidate.timed_out
+            and not self.experiment.are_observations_equivalent(self.control, candidate)
+        ])
 
-        self.ignored = tuple(
-            candidate
-            for candidate in mismatched
-            if self.experiment.should_ignore_mismatched_observation(self.control, candidate)
-        )
+        if mismatched:
+            ignored = tuple(
+                candidate
+                for candidate in mismatched
+                if self.experiment.should_ignore_mismatched_observation(self.control, candidate)
+            )
+        else:
+            ignored = ()
 
-        self.mismatched = tuple(candidate for candidate in mismatched if not candidate in self.ignored)
+        self._ignored = ignored
+        self._mismatched = tuple(candidate for candidate in mismatched if not candidate in ignored)
@@ -0,0 +1,374 @@
+import math
+import threading
+import time
+
+
+class LatencyHistogram(object):
+
+    def __init__(self, precision=0.01, lowest=1e-6):
+        self.precision = precision
+        self.lowest = lowest
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._growth = math.log1p(precision)
+
+    def _index(self, value):
+        if value <= self.lowest:
+            return 0
+        return int(math.log(value / self.lowest) / self._growth) + 1
+
+    def _value(self, index):
+        if index == 0:
+            return self.lowest
+        return self.lowest * math.exp((index - 0.5) * self._growth)
+
+    def record(self, value):
+        index = self._index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def percentile(self, percentile):
+        if not self.count:
+            return None
+        if percentile <= 0:
+            return self.min
+
+        target = max(1, math.ceil(percentile / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+        }
+
+
+def _z_score(confidence):
+    low, high = 0.0, 10.0
+    for _ in range(60):
+        middle = (low + high) / 2
+        if math.erf(middle / math.sqrt(2)) < confidence:
+            low = middle
+        else:
+            high = middle
+    return high
+
+
+class PairedComparison(object):
+    FASTER = 'faster'
+    SLOWER = 'slower'
+    INCONCLUSIVE = 'inconclusive'
+    INSUFFICIENT = 'insufficient'
+
+    def __init__(self, confidence=0.95, min_samples=30):
+        self.confidence = confidence
+        self.min_samples = min_samples
+        self.count = 0
+        self.faster = 0
+        self.slower = 0
+        self.mean_difference = 0.0
+        self.mean_control = 0.0
+        self._m2 = 0.0
+        self._z = _z_score(confidence)
+
+    def record(self, control_duration, candidate_duration):
+        difference = candidate_duration - control_duration
+        self.count += 1
+
+        delta = difference - self.mean_difference
+        self.mean_difference += delta / self.count
+        self._m2 += delta * (difference - self.mean_difference)
+        self.mean_control += (control_duration - self.mean_control) / self.count
+
+        if difference < 0:
+            self.faster += 1
+        elif difference > 0:
+            self.slower += 1
+
+    @property
+    def stdev(self):
+        if self.count < 2:
+            return None
+        return math.sqrt(self._m2 / (self.count - 1))
+
+    @property
+    def interval(self):
+        stdev = self.stdev
+        if stdev is None:
+            return None
+        margin = self._z * stdev / math.sqrt(self.count)
+        return (self.mean_difference - margin, self.mean_difference + margin)
+
+    @property
+    def effect_size(self):
+        stdev = self.stdev
+        if not stdev:
+            return None
+        return self.mean_difference / stdev
+
+    @property
+    def relative_change(self):
+        if not self.mean_control:
+            return None
+        return self.mean_difference / self.mean_control
+
+    @property
+    def sign_test_p_value(self):
+        decided = self.faster + self.slower
+        if not decided:
+            return None
+        z = (abs(self.slower - decided / 2.0) - 0.5) / math.sqrt(decided / 4.0)
+        return min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+    @property
+    def verdict(self):
+        if self.count < self.min_samples:
+            return PairedComparison.INSUFFICIENT
+
+        interval = self.interval
+        p_value = self.sign_test_p_value
+        if interval is None or p_value is None or p_value >= 1 - self.confidence:
+            return PairedComparison.INCONCLUSIVE
+        if interval[1] < 0 and self.faster > self.slower:
+            return PairedComparison.FASTER
+        if interval[0] > 0 and self.slower > self.faster:
+            return PairedComparison.SLOWER
+        return PairedComparison.INCONCLUSIVE
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'verdict': self.verdict,
+            'mean_difference': self.mean_difference if self.count else None,
+            'interval': self.interval,
+            'effect_size': self.effect_size,
+            'relative_change': self.relative_change,
+            'faster': self.faster,
+            'slower': self.slower,
+            'sign_test_p_value': self.sign_test_p_value,
+        }
+
+
+def _add_metrics(totals, metrics):
+    for name, value in metrics.items():
+        total = totals.get(name)
+        if total is None:
+            totals[name] = [value, 1]
+        else:
+            total[0] += value
+            total[1] += 1
+
+
+def _mean_metrics(totals):
+    return dict((name, total / count) for name, (total, count) in totals.items())
+
+
+class _CandidateStats(object):
+
+    def __init__(self, precision, confidence, min_samples):
+        self.runs = 0
+        self.matched = 0
+        self.mismatched = 0
+        self.ignored = 0
+        self.raised = 0
+        self.timed_out = 0
+        self.latency = LatencyHistogram(precision)
+        self.comparison = PairedComparison(confidence, min_samples)
+        self.metrics = {}
+
+    def snapshot(self):
+        compared = self.matched + self.mismatched
+        return {
+            'runs': self.runs,
+            'matched': self.matched,
+            'mismatched': self.mismatched,
+            'ignored': self.ignored,
+            'raised': self.raised,
+            'timed_out': self.timed_out,
+            'match_rate': self.matched / compared if compared else None,
+            'latency': self.latency.snapshot(),
+            'latency_comparison': self.comparison.snapshot(),
+            'metrics': _mean_metrics(self.metrics),
+        }
+
+
+class _ExperimentStats(object):
+
+    def __init__(self, precision):
+        self.runs = 0
+        self.raised = 0
+        self.control = LatencyHistogram(precision)
+        self.metrics = {}
+        self.candidates = {}
+
+    def snapshot(self):
+        return {
+            'runs': self.runs,
+            'control': {
+                'raised': self.raised,
+                'latency': self.control.snapshot(),
+                'metrics': _mean_metrics(self.metrics),
+            },
+            'candidates': dict(
+                (name, candidate.snapshot()) for name, candidate in self.candidates.items()
+            ),
+        }
+
+
+class Aggregator(object):
+
+    def __init__(self, precision=0.01, interval=None, on_snapshot=None,
+                 confidence=0.95, min_samples=30):
+        self.precision = precision
+        self.confidence = confidence
+        self.min_samples = min_samples
+        self.interval = interval
+        self.on_snapshot = on_snapshot
+
+        self._experiments = {}
+        self._started = time.time()
+        self._window_started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _experiment(self, name):
+        stats = self._experiments.get(name)
+        if stats is None:
+            stats = self._experiments[name] = _ExperimentStats(self.precision)
+        return stats
+
+    def record(self, result):
+        mismatched = set(id(candidate) for candidate in result.mismatched)
+        ignored = set(id(candidate) for candidate in result.ignored)
+        control = result.control
+        snapshot = None
+
+        with self._lock:
+            stats = self._experiment(result.experiment_name)
+            stats.runs += 1
+
+            if control is not None:
+                if control.raised_exception is not None:
+                    stats.raised += 1
+                if control.duration is not None:
+                    stats.control.record(control.duration)
+                if control.metrics:
+                    _add_metrics(stats.metrics, control.metrics)
+
+            for candidate in result.candidates:
+                candidate_stats = stats.candidates.get(candidate.name)
+                if candidate_stats is None:
+                    candidate_stats = stats.candidates[candidate.name] = _CandidateStats(
+                        self.precision, self.confidence, self.min_samples
+                    )
+
+                candidate_stats.runs += 1
+                if candidate.timed_out:
+                    candidate_stats.timed_out += 1
+                    continue
+
+                if candidate.raised_exception is not None:
+                    candidate_stats.raised += 1
+                if id(candidate) in ignored:
+                    candidate_stats.ignored += 1
+                elif id(candidate) in mismatched:
+                    candidate_stats.mismatched += 1
+                else:
+                    candidate_stats.matched += 1
+
+                if candidate.metrics:
+                    _add_metrics(candidate_stats.metrics, candidate.metrics)
+
+                if candidate.duration is not None:
+                    candidate_stats.latency.record(candidate.duration)
+                    if (
+                        control is not None and control.duration is not None
+                        and control.raised_exception is None
+                        and candidate.raised_exception is None
+                    ):
+                        candidate_stats.comparison.record(control.duration, candidate.duration)
+
+            if self.interval is not None and (
+                time.monotonic() - self._window_started >= self.interval
+            ):
+                snapshot = self._snapshot(reset=True)
+
+        if snapshot is not None and self.on_snapshot:
+            self.on_snapshot(snapshot)
+
+    def percentile(self, experiment, percentile, candidate=None):
+        with self._lock:
+            stats = self._experiments.get(experiment)
+            if stats is None:
+                return None
+            if candidate is None:
+                return stats.control.percentile(percentile)
+            candidate_stats = stats.candidates.get(candidate)
+            if candidate_stats is None:
+                return None
+            return candidate_stats.latency.percentile(percentile)
+
+    def verdict(self, experiment, candidate):
+        with self._lock:
+            stats = self._experiments.get(experiment)
+            candidate_stats = stats and stats.candidates.get(candidate)
+            if candidate_stats is None:
+                return PairedComparison.INSUFFICIENT
+            return candidate_stats.comparison.verdict
+
+    def _snapshot(self, reset):
+        now = time.monotonic()
+        snapshot = {
+            'started': self._started,
+            'elapsed': now - self._window_started,
+            'experiments': dict(
+                (name, stats.snapshot()) for name, stats in self._experiments.items()
+            ),
+        }
+
+        if reset:
+            self._experiments = {}
+            self._started = time.time()
+            self._window_started = now
+
+        return snapshot
+
+    def snapshot(self, reset=False):
+        with self._lock:
+            return self._snapshot(reset)
+
+    def reset(self):
+        self.snapshot(reset=True)
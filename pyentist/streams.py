@@ -0,0 +1,361 @@
+import collections
+import threading
+import time
+
+from .comparers import MISSING
+from .executors import ProcessCandidatePool
+from .observation import Observation
+from .result import Result
+from .errors import MismatchError
+
+
+def _ended(outcome):
+    return outcome[1] is not None or outcome[0] is MISSING
+
+
+class StreamObservation(Observation):
+    __slots__ = ('count', 'diverged_at', 'expected')
+
+    @classmethod
+    def started(cls, name, experiment):
+        observation = cls.from_outcome(name, experiment, duration=0)
+        observation.now = time.time()
+        observation.started_ns = time.perf_counter_ns()
+        observation.count = 0
+        observation.diverged_at = None
+        observation.expected = None
+        return observation
+
+    def spend(self, duration_ns):
+        self.duration_ns += duration_ns
+        self.duration = self.duration_ns / 1e9
+
+    def diverge(self, index, expected, actual):
+        value, exception = expected
+        self.diverged_at = index
+        self.expected = Observation.from_outcome(
+            self.name, self.experiment, value, exception, duration=0
+        )
+        self.returned_value, self.raised_exception = actual
+        if self.experiment.fingerprint_values:
+            self.take_fingerprint()
+
+    def release(self):
+        super(StreamObservation, self).release()
+        if self.expected is not None:
+            self.expected.release()
+
+
+class StreamResult(Result):
+    __slots__ = ()
+
+    @property
+    def differences(self):
+        if self._differences is None:
+            differences = {}
+            for candidate in self.mismatched:
+                prefix = '[{}]'.format(candidate.diverged_at)
+                differences[candidate.name] = [
+                    (prefix + path, a, b)
+                    for path, a, b in self.experiment.observation_differences(
+                        candidate.expected, candidate
+                    )
+                ]
+            self._differences = differences
+        return self._differences
+
+    @property
+    def summaries(self):
+        if self._summaries is None:
+            summaries = {}
+            for candidate in self.mismatched:
+                prefix = '[{}]'.format(candidate.diverged_at)
+                summary = self.experiment.observation_summaries(candidate.expected, candidate)
+                if summary:
+                    summaries[candidate.name] = dict(
+                        (prefix + path, value) for path, value in summary.items()
+                    )
+            self._summaries = summaries
+        return self._summaries
+
+    def evaluate_candidates(self):
+        experiment = self.experiment
+        mismatched = tuple(
+            candidate
+            for candidate in self.candidates
+            if not candidate.timed_out and candidate.diverged_at is not None
+        )
+        ignored = tuple(
+            candidate
+            for candidate in mismatched
+            if experiment.should_ignore_mismatched_observation(candidate.expected, candidate)
+        )
+
+        self._ignored = ignored
+        self._mismatched = tuple(candidate for candidate in mismatched if candidate not in ignored)
+
+
+class _Stream(object):
+
+    def __init__(self, observation, callback, args=(), kwargs=None):
+        self.observation = observation
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+        self.iterator = None
+        self.error = None
+
+    def open(self):
+        started = time.perf_counter_ns()
+        try:
+            if self.kwargs:
+                self.iterator = iter(self.callback(*self.args, **self.kwargs))
+            else:
+                self.iterator = iter(self.callback(*self.args))
+        except Exception as e:
+            self.error = e
+        self.observation.spend(time.perf_counter_ns() - started)
+
+    def step(self):
+        if self.error is not None:
+            self.observation.raised_exception = self.error
+            return None, self.error
+        if self.iterator is None:
+            return MISSING, None
+
+        started = time.perf_counter_ns()
+        try:
+            outcome = next(self.iterator), None
+        except StopIteration:
+            outcome = MISSING, None
+        except Exception as e:
+            self.observation.raised_exception = e
+            outcome = None, e
+        self.observation.spend(time.perf_counter_ns() - started)
+
+        if _ended(outcome):
+            self.iterator = None
+        return outcome
+
+    def close(self):
+        iterator, self.iterator = self.iterator, None
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                self.observation.experiment.raised('close', e)
+
+
+class _CandidateStream(_Stream):
+
+    def __init__(self, observation, callback, args=(), kwargs=None, window=None):
+        super(_CandidateStream, self).__init__(observation, callback, args, kwargs)
+        self.window = window
+        self.done = False
+        self.abandoned = False
+        self._pending = collections.deque()
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def compare(self, outcome):
+        observation = self.observation
+        experiment = observation.experiment
+        actual = self.step()
+
+        if not experiment.are_outcomes_equivalent(outcome, actual):
+            observation.diverge(observation.count, outcome, actual)
+            return True
+        if _ended(outcome):
+            return True
+
+        observation.count += 1
+        timeout = experiment.candidate_timeout
+        if timeout is not None and observation.duration > timeout:
+            observation.timed_out = True
+            return True
+        return False
+
+    def offer(self, outcome):
+        with self._condition:
+            if self.done:
+                return
+            if len(self._pending) >= self.window:
+                self.done = self.abandoned = True
+                self._pending.clear()
+            else:
+                self._pending.append(outcome)
+            self._condition.notify()
+
+    def finish(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+    def _take(self):
+        with self._condition:
+            while not self._pending and not self._closed and not self.done:
+                self._condition.wait()
+            if self.done or not self._pending:
+                return None
+            return self._pending.popleft()
+
+    def follow(self, run):
+        try:
+            self.open()
+            while True:
+                outcome = self._take()
+                if outcome is None:
+                    break
+                if self.compare(outcome):
+                    with self._condition:
+                        self.done = True
+                    break
+        finally:
+            self.close()
+            run.release()
+
+
+class _StreamRun(object):
+
+    def __init__(self, experiment, control, candidates, context, pending):
+        self.experiment = experiment
+        self.control = control
+        self.candidates = candidates
+        self.context = context
+        self.result = None
+        self._pending = pending
+        self._lock = threading.Lock()
+
+    def release(self):
+        with self._lock:
+            self._pending -= 1
+            if self._pending:
+                return None
+
+        for candidate in self.candidates:
+            if candidate.abandoned:
+                observation = candidate.observation
+                observation.timed_out = True
+                observation.returned_value = observation.raised_exception = None
+
+        observations = [self.control.observation]
+        observations.extend(candidate.observation for candidate in self.candidates)
+        result = StreamResult(self.experiment, observations, observations[0], self.context)
+        self.result = self.experiment.result = result
+        self.experiment._publish(result)
+        return result
+
+
+class ObservedStream(object):
+
+    def __init__(self, experiment, name, callback, args=(), kwargs=None, context=None):
+        self.experiment = experiment
+        self._control = _Stream(StreamObservation.started(name, experiment), callback, args, kwargs)
+        self._control.open()
+        self._candidates = []
+        self._followers = []
+        self._finished = False
+
+        pool = experiment.candidate_pool
+        windowed = pool is not None and not isinstance(pool, ProcessCandidatePool)
+        window = experiment.stream_window if windowed else None
+
+        for key in experiment._behaviors_names(name):
+            if key == name:
+                continue
+            candidate = _CandidateStream(
+                StreamObservation.started(key, experiment), experiment.behaviors[key],
+                args, kwargs, window
+            )
+            if windowed:
+                self._followers.append(candidate)
+            else:
+                candidate.open()
+                self._candidates.append(candidate)
+
+        self._run = _StreamRun(
+            experiment, self._control, self._candidates + self._followers, context,
+            1 + len(self._followers)
+        )
+
+        for candidate in list(self._followers):
+            if pool.submit(candidate.follow, self._run) is None:
+                self._followers.remove(candidate)
+                self._run.candidates.remove(candidate)
+                self._run.release()
+
+        if self._control.error is not None:
+            self._advance()
+
+    @property
+    def result(self):
+        return self._run.result
+
+    @property
+    def control(self):
+        return self._control.observation
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._finished:
+            raise StopIteration
+
+        value, exception = self._advance()
+        if self._finished:
+            self._raise_on_mismatch()
+        if exception is not None:
+            raise exception
+        if value is MISSING:
+            raise StopIteration
+        return value
+
+    def _advance(self):
+        outcome = self._control.step()
+
+        for candidate in list(self._candidates):
+            if candidate.compare(outcome):
+                candidate.close()
+                self._candidates.remove(candidate)
+        for candidate in self._followers:
+            candidate.offer(outcome)
+
+        if _ended(outcome):
+            self._finish()
+        else:
+            self._control.observation.count += 1
+        return outcome
+
+    def _finish(self):
+        self._finished = True
+        for candidate in self._candidates:
+            candidate.close()
+        for candidate in self._followers:
+            candidate.finish()
+
+        self._run.release()
+
+    def _raise_on_mismatch(self):
+        result = self._run.result
+        if (
+            result is not None and not self._followers
+            and self.experiment.should_raise_on_mismatch and result.was_mismatched
+        ):
+            raise MismatchError(self.experiment.name, result)
+
+    def close(self):
+        if not self._finished:
+            self._control.close()
+            self._finish()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        if not getattr(self, '_finished', True):
+            self.close()
@@ -0,0 +1,162 @@
+from .. import ArrayComparer, DefaultExperiment, to_record
+from ..comparers import numpy
+
+import unittest
+
+
+@unittest.skipIf(numpy is not None, 'numpy is installed')
+class TestWithoutNumpy(unittest.TestCase):
+
+    def test_needs_numpy(self):
+        with self.assertRaises(ImportError):
+            ArrayComparer()
+
+
+@unittest.skipUnless(numpy is not None, 'numpy is not installed')
+class TestArrayComparer(unittest.TestCase):
+
+    def setUp(self):
+        self.comparer = ArrayComparer()
+
+    def test_compares_arrays(self):
+        a = numpy.arange(12.0).reshape(3, 4)
+
+        self.assertTrue(self.comparer.equal(a, a.copy()))
+        b = a.copy()
+        b[2, 1] = -1
+        self.assertFalse(self.comparer.equal(a, b))
+
+    def test_checks_shape_and_dtype(self):
+        a = numpy.arange(4)
+
+        self.assertFalse(self.comparer.equal(a, a.reshape(2, 2)))
+        self.assertFalse(self.comparer.equal(a, a.astype(numpy.float64)))
+        self.assertTrue(ArrayComparer(check_dtype=False).equal(a, a.astype(numpy.float64)))
+
+    def test_tolerance(self):
+        a = numpy.array([1.0, 2.0, 3.0])
+        b = a + 1e-6
+
+        self.assertFalse(self.comparer.equal(a, b))
+        self.assertTrue(ArrayComparer(tolerance=1e-5).equal(a, b))
+        self.assertTrue(ArrayComparer(relative_tolerance=1e-5).equal(a, b))
+
+    def test_nan_aware_equality(self):
+        a = numpy.array([1.0, numpy.nan])
+
+        self.assertTrue(self.comparer.equal(a, a.copy()))
+        self.assertFalse(ArrayComparer(equal_nan=False).equal(a, a.copy()))
+
+    def test_compares_non_numeric_arrays(self):
+        a = numpy.array(['a', 'b'])
+
+        self.assertTrue(self.comparer.equal(a, a.copy()))
+        self.assertFalse(self.comparer.equal(a, numpy.array(['a', 'c'])))
+        self.assertTrue(self.comparer.equal(
+            numpy.array([None, float('nan')], dtype=object),
+            numpy.array([None, float('nan')], dtype=object),
+        ))
+
+    def test_compares_columnar_results(self):
+        a = {'ids': numpy.arange(3), 'scores': numpy.array([0.5, 0.25, 0.125]), 'total': 3}
+        b = {'ids': numpy.arange(3), 'scores': numpy.array([0.5, 0.25, 0.125]), 'total': 3}
+
+        self.assertTrue(self.comparer.equal(a, b))
+        b['scores'] = numpy.array([0.5, 0.5, 0.125])
+        self.assertEqual(
+            self.comparer._walk(a, b, 10)[0][1:], (0.25, 0.5)
+        )
+
+    def test_arrays_against_other_values(self):
+        self.assertFalse(self.comparer.equal(numpy.arange(3), [0, 1, 2]))
+        self.assertFalse(self.comparer.equal(None, numpy.arange(3)))
+
+    def test_compares_bare_arrays(self):
+        e = DefaultExperiment('arrays')
+        e.comparer = ArrayComparer()
+        e.use(lambda: numpy.arange(5))
+        e.try_candidate('same', lambda: numpy.arange(5))
+        e.try_candidate('different', lambda: numpy.arange(1, 6))
+        e.run()
+
+        self.assertEqual([o.name for o in e.result.mismatched], ['different'])
+        self.assertEqual(e.result.differences['different'][0][0], '[0]')
+
+    def test_reports_the_first_differing_indices(self):
+        e = DefaultExperiment('arrays')
+        e.comparer = ArrayComparer(max_differences=2)
+        e.use(lambda: {'grid': numpy.zeros((3, 3))})
+        e.try_candidate(lambda: {'grid': numpy.eye(3)})
+        e.run()
+
+        self.assertTrue(e.result.was_mismatched)
+        self.assertEqual(e.result.differences['candidate'], [
+            ("['grid'][0, 0]", 0.0, 1.0),
+            ("['grid'][1, 1]", 0.0, 1.0),
+        ])
+
+    def test_reports_shape_and_dtype_changes(self):
+        a = numpy.arange(4)
+        differences = self.comparer._walk({'a': a}, {'a': a.reshape(2, 2)}, 10)
+
+        self.assertEqual(differences[0][1:], ((4,), (2, 2)))
+
+    def test_summary(self):
+        a = numpy.array([[1.0, 2.0], [3.0, 4.0]])
+        b = numpy.array([[1.0, 2.5], [3.0, 2.0]])
+
+        self.assertEqual(self.comparer.summary(a, b), {
+            'count': 2,
+            'max_abs_error': 2.0,
+            'first_indices': [(0, 1), (1, 1)],
+        })
+        self.assertEqual(self.comparer.summary(a, a)['count'], 0)
+        self.assertEqual(self.comparer.summary(a, a.ravel()), {'shape': ((2, 2), (4,))})
+
+    def test_results_carry_summaries(self):
+        e = DefaultExperiment('arrays')
+        e.comparer = ArrayComparer(max_differences=2)
+        e.use(lambda: {'grid': numpy.zeros((3, 3)), 'ids': numpy.arange(3)})
+        e.try_candidate('same', lambda: {'grid': numpy.zeros((3, 3)), 'ids': numpy.arange(3)})
+        e.try_candidate('different', lambda: {'grid': numpy.eye(3) * 2, 'ids': numpy.arange(3)})
+        e.run()
+
+        summary = {'count': 3, 'max_abs_error': 2.0, 'first_indices': [(0, 0), (1, 1)]}
+        self.assertEqual(e.result.summaries, {'different': {"['grid']": summary}})
+        observations = dict(
+            (entry['name'], entry) for entry in to_record(e.result)['observations']
+        )
+        self.assertEqual(observations['different']['summaries'], {"['grid']": summary})
+        self.assertNotIn('summaries', observations['same'])
+
+    def test_summaries_of_bare_arrays_with_fingerprints(self):
+        e = DefaultExperiment('arrays')
+        e.comparer = ArrayComparer()
+        e.fingerprint_values = True
+        e.keep_mismatched_values = True
+        e.use(lambda: numpy.arange(5.0))
+        e.try_candidate(lambda: numpy.arange(5.0) + 0.5)
+        e.run()
+
+        self.assertEqual(e.result.summaries['candidate']['']['count'], 5)
+        self.assertEqual(e.result.summaries['candidate']['']['max_abs_error'], 0.5)
+
+    def test_stream_summaries_are_prefixed_with_the_index(self):
+        e = DefaultExperiment('arrays')
+        e.comparer = ArrayComparer()
+        e.element_comparer = e.comparer.equal
+        e.use(lambda: iter([numpy.zeros(2), numpy.zeros(2)]))
+        e.try_candidate(lambda: iter([numpy.zeros(2), numpy.ones(2)]))
+        list(e.run_stream())
+
+        self.assertEqual(list(e.result.summaries['candidate']), ['[1]'])
+
+    def test_summary_of_unsigned_arrays(self):
+        a = numpy.array([1, 5], dtype=numpy.uint8)
+        b = numpy.array([3, 5], dtype=numpy.uint8)
+
+        self.assertEqual(self.comparer.summary(a, b)['max_abs_error'], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+from .. import AsyncDefaultExperiment, MismatchError, science
+
+import asyncio
+import unittest
+
+
+class TestAsyncExperiment(unittest.TestCase):
+
+    def setUp(self):
+        self.published = []
+        self.ex = AsyncDefaultExperiment('async')
+        self.ex.publish = self.published.append
+
+    def run_async(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def test_awaits_coroutine_behaviors(self):
+        async def control():
+            return 'control'
+
+        async def candidate():
+            return 'candidate'
+
+        self.ex.use(control)
+        self.ex.try_candidate(candidate)
+
+        self.assertEqual(self.run_async(self.ex.run()), 'control')
+        self.assertEqual(self.published[0].candidates[0].returned_value, 'candidate')
+
+    def test_accepts_plain_callables(self):
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(lambda: 'candidate')
+
+        self.assertEqual(self.run_async(self.ex.run()), 'control')
+
+    def test_runs_behaviors_concurrently(self):
+        async def behavior(event, other):
+            event.set()
+            await asyncio.wait_for(other.wait(), 1)
+            return 'ok'
+
+        async def main():
+            control_started = asyncio.Event()
+            candidate_started = asyncio.Event()
+            self.ex.use(lambda: behavior(control_started, candidate_started))
+            self.ex.try_candidate(lambda: behavior(candidate_started, control_started))
+            return await self.ex.run()
+
+        self.assertEqual(self.run_async(main()), 'ok')
+        self.assertIsNone(self.published[0].candidates[0].raised_exception)
+
+    def test_runs_only_the_control_when_disabled(self):
+        ran = []
+
+        async def candidate():
+            ran.append('candidate')
+
+        async def control():
+            return 'control'
+
+        self.ex.is_enabled = lambda: False
+        self.ex.use(control)
+        self.ex.try_candidate(candidate)
+
+        self.assertEqual(self.run_async(self.ex.run()), 'control')
+        self.assertEqual(ran, [])
+        self.assertEqual(self.published, [])
+
+    def test_times_out_slow_candidates(self):
+        async def slow():
+            await asyncio.sleep(1)
+
+        self.ex.candidate_timeout = 0.01
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(slow)
+
+        self.assertEqual(self.run_async(self.ex.run()), 'control')
+        candidate = self.published[0].candidates[0]
+        self.assertTrue(candidate.timed_out)
+        self.assertIsNone(candidate.raised_exception)
+        self.assertEqual(self.published[0].timed_out, (candidate,))
+
+    def test_abandons_candidates_over_the_overhead_budget(self):
+        async def slow():
+            await asyncio.sleep(1)
+
+        self.ex.overhead_budget = 0.01
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(slow)
+
+        self.assertEqual(self.run_async(self.ex.run()), 'control')
+        result = self.published[0]
+        self.assertTrue(result.was_timed_out)
+        self.assertFalse(result.was_mismatched)
+
+    def test_raises_control_exceptions(self):
+        async def control():
+            raise ValueError('kaboom')
+
+        self.ex.use(control)
+        self.ex.try_candidate(lambda: 1)
+
+        with self.assertRaises(ValueError):
+            self.run_async(self.ex.run())
+
+    def test_raises_on_mismatch(self):
+        self.ex.should_raise_on_mismatch = True
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(lambda: 'candidate')
+
+        with self.assertRaises(MismatchError):
+            self.run_async(self.ex.run())
+
+    def test_awaits_async_publish(self):
+        published = []
+
+        async def publish(result):
+            published.append(result)
+
+        self.ex.publish = publish
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(lambda: 'candidate')
+
+        self.run_async(self.ex.run())
+        self.assertEqual(len(published), 1)
+
+    def test_publishes_in_the_background(self):
+        async def main():
+            release = asyncio.Event()
+
+            async def candidate():
+                await release.wait()
+                return 'candidate'
+
+            self.ex.publish_in_background = True
+            self.ex.use(lambda: 'control')
+            self.ex.try_candidate(candidate)
+
+            value = await self.ex.run()
+            self.assertEqual(self.published, [])
+
+            release.set()
+            await self.ex.flush()
+            return value
+
+        self.assertEqual(self.run_async(main()), 'control')
+        self.assertEqual(self.published[0].candidates[0].returned_value, 'candidate')
+
+
+class TestAsyncScience(unittest.TestCase):
+
+    def test_async_with_runs_the_experiment(self):
+        async def control():
+            return 'control'
+
+        async def main():
+            async with science('async-science') as e:
+                e.use(control)
+                e.try_candidate(lambda: 'candidate')
+            return e
+
+        e = asyncio.run(main())
+        self.assertIsInstance(e, AsyncDefaultExperiment)
+        self.assertEqual(e.returned_value, 'control')
+
+    def test_with_still_runs_the_experiment(self):
+        with science('sync-science') as e:
+            e.use(lambda: 'control')
+            e.try_candidate(lambda: 'candidate')
+
+        self.assertEqual(e.returned_value, 'control')
+
+    def test_does_not_run_when_the_block_raises(self):
+        ran = []
+
+        with self.assertRaises(KeyError):
+            with science('sync-science') as e:
+                e.use(lambda: ran.append('control'))
+                raise KeyError('boom')
+
+        self.assertEqual(ran, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+from .. import DefaultExperiment, BackgroundWorker, CandidatePool
+
+import threading
+import unittest
+
+
+class TestBackgroundWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.worker = BackgroundWorker(max_queue=2)
+
+    def tearDown(self):
+        self.worker.shutdown()
+
+    def block(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def job():
+            started.set()
+            release.wait(5)
+
+        self.worker.submit(job)
+        started.wait(5)
+        return release
+
+    def test_rejects_unknown_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            BackgroundWorker(overflow='drop_all')
+
+    def test_runs_submitted_jobs(self):
+        ran = []
+        self.worker.submit(ran.append, 1)
+        self.worker.submit(ran.append, 2)
+
+        self.assertTrue(self.worker.flush(5))
+        self.assertEqual(ran, [1, 2])
+        self.assertEqual(self.worker.completed, 2)
+
+    def test_drops_newest_jobs_when_full(self):
+        ran = []
+        release = self.block()
+
+        self.assertTrue(self.worker.submit(ran.append, 1))
+        self.assertTrue(self.worker.submit(ran.append, 2))
+        self.assertFalse(self.worker.submit(ran.append, 3))
+
+        release.set()
+        self.worker.flush(5)
+        self.assertEqual(ran, [1, 2])
+        self.assertEqual(self.worker.dropped, 1)
+
+    def test_drops_oldest_jobs_when_full(self):
+        self.worker = BackgroundWorker(max_queue=2, overflow=BackgroundWorker.DROP_OLDEST)
+        ran = []
+        release = self.block()
+
+        self.worker.submit(ran.append, 1)
+        self.worker.submit(ran.append, 2)
+        self.assertTrue(self.worker.submit(ran.append, 3))
+
+        release.set()
+        self.worker.flush(5)
+        self.assertEqual(ran, [2, 3])
+        self.assertEqual(self.worker.dropped, 1)
+
+    def test_counts_failed_jobs(self):
+        self.worker.submit(lambda: 1 / 0)
+        self.worker.flush(5)
+        self.assertEqual(self.worker.failed, 1)
+
+    def test_shutdown_drains_the_queue_and_refuses_new_jobs(self):
+        ran = []
+        release = self.block()
+        self.worker.submit(ran.append, 1)
+
+        release.set()
+        self.worker.shutdown()
+
+        self.assertEqual(ran, [1])
+        self.assertFalse(self.worker.submit(ran.append, 2))
+
+
+class TestDetachedExperiment(unittest.TestCase):
+
+    def setUp(self):
+        self.published = []
+        self.worker = BackgroundWorker()
+        self.ex = DefaultExperiment('detached')
+        self.ex.background_worker = self.worker
+        self.ex.publish = self.published.append
+
+    def tearDown(self):
+        self.worker.shutdown()
+
+    def test_returns_control_before_candidates_finish(self):
+        release = threading.Event()
+
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(lambda: release.wait(5) and 'candidate')
+
+        self.assertEqual(self.ex.run(), 'control')
+        self.assertEqual(self.published, [])
+
+        release.set()
+        self.worker.flush(5)
+
+        (result,) = self.published
+        self.assertEqual(result.control.returned_value, 'control')
+        self.assertEqual(result.candidates[0].returned_value, 'candidate')
+
+    def test_raises_control_exception_right_away(self):
+        self.ex.use(lambda: 1 / 0)
+        self.ex.try_candidate(lambda: 1)
+
+        with self.assertRaises(ZeroDivisionError):
+            self.ex.run()
+
+        self.worker.flush(5)
+        self.assertEqual(len(self.published), 1)
+
+    def test_does_not_raise_on_mismatch(self):
+        self.ex.should_raise_on_mismatch = True
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(lambda: 'candidate')
+
+        self.assertEqual(self.ex.run(), 'control')
+        self.worker.flush(5)
+        self.assertTrue(self.published[0].was_mismatched)
+
+    def test_runs_candidates_on_the_candidate_pool(self):
+        pool = CandidatePool(max_workers=2)
+        self.ex.candidate_pool = pool
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate('a', lambda: 'a')
+        self.ex.try_candidate('b', lambda: 'b')
+
+        self.assertEqual(self.ex.run(), 'control')
+        self.worker.flush(5)
+        pool.shutdown()
+
+        self.assertEqual(
+            sorted(o.returned_value for o in self.published[0].candidates),
+            ['a', 'b']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+from .. import CircuitBreaker, DefaultExperiment
+
+import time
+import unittest
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.changes = []
+        self.breaker = CircuitBreaker(
+            window=10, min_samples=5, max_mismatch_rate=0.5, max_exception_rate=0.5,
+            cooldown=0.05, on_state_change=lambda *change: self.changes.append(change)
+        )
+        self.ran = []
+        self.candidate_value = 'control'
+
+        self.ex = DefaultExperiment('breaker')
+        self.ex.circuit_breaker = self.breaker
+        self.ex.comparer = lambda a, b: a.returned_value == b.returned_value
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(self.candidate)
+
+    def candidate(self):
+        self.ran.append('candidate')
+        if isinstance(self.candidate_value, Exception):
+            raise self.candidate_value
+        return self.candidate_value
+
+    def run_times(self, times):
+        for _ in range(times):
+            self.assertEqual(self.ex.run(), 'control')
+
+    def test_stays_closed_while_candidates_match(self):
+        self.run_times(10)
+
+        self.assertEqual(self.breaker.state('candidate'), CircuitBreaker.CLOSED)
+        self.assertEqual(len(self.ran), 10)
+        self.assertEqual(self.changes, [])
+
+    def test_opens_on_mismatches_and_stops_running_the_candidate(self):
+        self.candidate_value = 'candidate'
+        self.run_times(5)
+        self.assertEqual(self.breaker.state('candidate'), CircuitBreaker.OPEN)
+        self.assertEqual(self.changes, [('candidate', CircuitBreaker.CLOSED, CircuitBreaker.OPEN)])
+
+        self.run_times(5)
+        self.assertEqual(len(self.ran), 5)
+
+    def test_opens_on_exceptions(self):
+        self.candidate_value = ValueError('kaboom')
+        self.run_times(5)
+
+        self.assertEqual(self.breaker.state('candidate'), CircuitBreaker.OPEN)
+
+    def test_opens_on_slow_candidates(self):
+        breaker = CircuitBreaker(min_samples=3, max_slowdown=10)
+        self.ex.circuit_breaker = breaker
+        self.ex.behaviors['candidate'] = lambda: time.sleep(0.002) or 'control'
+        self.run_times(3)
+
+        self.assertEqual(breaker.state('candidate'), CircuitBreaker.OPEN)
+
+    def test_waits_for_enough_samples(self):
+        self.candidate_value = 'candidate'
+        self.run_times(4)
+
+        self.assertEqual(self.breaker.state('candidate'), CircuitBreaker.CLOSED)
+
+    def test_half_opens_after_the_cooldown_and_closes_on_a_good_probe(self):
+        self.candidate_value = 'candidate'
+        self.run_times(5)
+
+        time.sleep(0.06)
+        self.candidate_value = 'control'
+        self.run_times(1)
+
+        self.assertEqual(len(self.ran), 6)
+        self.assertEqual(self.breaker.state('candidate'), CircuitBreaker.CLOSED)
+        self.assertEqual(
+            [change[2] for change in self.changes],
+            [CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN, CircuitBreaker.CLOSED]
+        )
+
+    def test_reopens_on_a_bad_probe(self):
+        self.candidate_value = 'candidate'
+        self.run_times(5)
+
+        time.sleep(0.06)
+        self.run_times(3)
+
+        self.assertEqual(len(self.ran), 6)
+        self.assertEqual(self.breaker.state('candidate'), CircuitBreaker.OPEN)
+
+    def test_tracks_candidates_separately(self):
+        self.ex.try_candidate('other', lambda: 'control')
+        self.candidate_value = 'candidate'
+        self.run_times(5)
+
+        self.assertEqual(self.breaker.state('candidate'), CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.state('other'), CircuitBreaker.CLOSED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+from .. import DeepComparer, DefaultExperiment, Observation, to_record
+from ..comparers import MISSING
+
+import unittest
+
+
+class TestDeepComparer(unittest.TestCase):
+
+    def setUp(self):
+        self.comparer = DeepComparer()
+
+    def test_compares_nested_structures(self):
+        a = {'users': [{'id': 1, 'tags': ('a', 'b')}, {'id': 2, 'tags': ()}], 'ok': True}
+        b = {'users': [{'id': 1, 'tags': ('a', 'b')}, {'id': 2, 'tags': ()}], 'ok': True}
+
+        self.assertTrue(self.comparer.equal(a, b))
+        b['users'][1]['tags'] = ('c',)
+        self.assertFalse(self.comparer.equal(a, b))
+
+    def test_types_must_match(self):
+        self.assertFalse(self.comparer.equal([1], (1,)))
+        self.assertFalse(self.comparer.equal(True, 1))
+        self.assertFalse(self.comparer.equal('1', 1))
+        self.assertTrue(self.comparer.equal(1, 1.0))
+
+    def test_nan_equals_nan(self):
+        self.assertTrue(self.comparer.equal([float('nan')], [float('nan')]))
+
+    def test_float_tolerance(self):
+        self.assertFalse(self.comparer.equal({'total': 0.3}, {'total': 0.1 + 0.2}))
+
+        comparer = DeepComparer(tolerance=1e-9)
+        self.assertTrue(comparer.equal({'total': 0.3}, {'total': 0.1 + 0.2}))
+        self.assertFalse(comparer.equal({'total': 0.3}, {'total': 0.31}))
+
+        comparer = DeepComparer(relative_tolerance=0.01)
+        self.assertTrue(comparer.equal(1000.0, 1005.0))
+        self.assertFalse(comparer.equal(1000.0, 1011.0))
+
+    def test_ignores_order_when_asked(self):
+        self.assertFalse(self.comparer.equal([1, 2, 3], [3, 2, 1]))
+
+        comparer = DeepComparer(ignore_order=True)
+        self.assertTrue(comparer.equal([1, 2, 2, 3], [2, 3, 2, 1]))
+        self.assertFalse(comparer.equal([1, 2, 2], [1, 1, 2]))
+        self.assertTrue(comparer.equal([{'id': 1}, {'id': 2}], [{'id': 2}, {'id': 1}]))
+
+    def test_ignores_order_with_tolerance(self):
+        comparer = DeepComparer(tolerance=0.01, ignore_order=True)
+
+        self.assertTrue(comparer.equal([1.0, 2.0], [2.001, 0.999]))
+        self.assertFalse(comparer.equal([1.0, 2.0], [2.1, 0.999]))
+
+    def test_compares_sets(self):
+        self.assertTrue(self.comparer.equal({1, 2}, {2, 1}))
+        self.assertFalse(self.comparer.equal({1, 2}, {1, 3}))
+
+    def test_handles_deep_nesting_without_recursion(self):
+        a = b = None
+        for _ in range(10000):
+            a, b = [a], [b]
+
+        self.assertTrue(self.comparer.equal(a, b))
+
+    def test_stops_at_the_first_difference(self):
+        compared = []
+
+        class Spy(object):
+            def __init__(self, value):
+                self.value = value
+
+            def __eq__(self, other):
+                compared.append(self.value)
+                return self.value == other.value
+
+        self.assertFalse(self.comparer.equal(
+            [Spy(1), Spy(2), Spy(3)], [Spy(1), Spy(0), Spy(3)]
+        ))
+        self.assertEqual(compared, [1, 2])
+
+
+class TestDifferences(unittest.TestCase):
+
+    def setUp(self):
+        self.ex = DefaultExperiment('differences')
+
+    def observe(self, name, value):
+        return Observation.from_outcome(name, self.ex, value, duration=0)
+
+    def test_reports_differing_paths(self):
+        comparer = DeepComparer()
+        control = self.observe('control', {'a': [1, 2], 'b': {'c': 1}, 'd': 1})
+        candidate = self.observe('candidate', {'a': [1, 3], 'b': {'c': 2}, 'e': 1})
+
+        self.assertEqual(comparer.differences(control, candidate), [
+            ("['a'][1]", 2, 3),
+            ("['b']['c']", 1, 2),
+            ("['d']", 1, MISSING),
+            ("['e']", MISSING, 1),
+        ])
+
+    def test_reports_at_most_max_differences(self):
+        comparer = DeepComparer(max_differences=2)
+        control = self.observe('control', list(range(100)))
+        candidate = self.observe('candidate', [-1] * 100)
+
+        self.assertEqual(
+            [path for path, _, _ in comparer.differences(control, candidate)], ['[0]', '[1]']
+        )
+
+    def test_compares_exceptions(self):
+        comparer = DeepComparer()
+        control = Observation.from_outcome('control', self.ex, raised_exception=ValueError('a'))
+        same = Observation.from_outcome('same', self.ex, raised_exception=ValueError('a'))
+        other = self.observe('other', 1)
+
+        self.assertTrue(comparer(control, same))
+        self.assertFalse(comparer(control, other))
+        self.assertEqual(comparer.differences(control, same), [])
+        self.assertEqual(len(comparer.differences(control, other)), 1)
+
+    def test_uses_cleaned_values(self):
+        self.ex.cleaner = lambda value: value['id']
+        self.ex.comparer = DeepComparer()
+        self.ex.use(lambda: {'id': 1, 'loaded_at': 1})
+        self.ex.try_candidate(lambda: {'id': 1, 'loaded_at': 2})
+        self.ex.run()
+
+        self.assertTrue(self.ex.result.was_matched)
+
+    def test_results_report_differences(self):
+        self.ex.comparer = DeepComparer()
+        self.ex.use(lambda: {'id': 1, 'name': 'a'})
+        self.ex.try_candidate(lambda: {'id': 1, 'name': 'b'})
+        self.ex.run()
+
+        self.assertEqual(self.ex.result.differences, {'candidate': [("['name']", 'a', 'b')]})
+        record = to_record(self.ex.result)
+        candidate = [o for o in record['observations'] if o['name'] == 'candidate'][0]
+        self.assertEqual(candidate['differences'], ["['name']"])
+
+    def test_default_comparer_compares_values(self):
+        self.ex.use(lambda: [1, 2])
+        self.ex.try_candidate('same', lambda: [1, 2])
+        self.ex.try_candidate('different', lambda: [1, 3])
+        self.ex.run()
+
+        self.assertEqual([o.name for o in self.ex.result.mismatched], ['different'])
+        self.assertEqual(self.ex.result.differences, {'different': [('[1]', 2, 3)]})
+
+
+if __name__ == '__main__':
+    unittest.main()
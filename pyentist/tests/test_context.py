@@ -0,0 +1,125 @@
+from .. import (
+    BackgroundWorker, CandidatePool, DefaultExperiment, AsyncDefaultExperiment,
+    scientist_context, set_default_context, clear_default_context, default_scientist_context
+)
+from ..context import lookup
+
+import asyncio
+import unittest
+
+
+class TestScientistContext(unittest.TestCase):
+
+    def setUp(self):
+        self.published = []
+        self.ex = DefaultExperiment('context')
+        self.ex.publish = self.published.append
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(lambda: 'candidate')
+
+    def tearDown(self):
+        clear_default_context()
+
+    def test_is_empty_by_default(self):
+        self.assertEqual(dict(default_scientist_context()), {})
+
+    def test_scopes_values_to_the_block(self):
+        with scientist_context(request_id='r1'):
+            with scientist_context(tenant='t1') as context:
+                self.assertEqual(dict(context), {'request_id': 'r1', 'tenant': 't1'})
+            self.assertEqual(dict(default_scientist_context()), {'request_id': 'r1'})
+
+        self.assertEqual(dict(default_scientist_context()), {})
+
+    def test_merges_process_defaults(self):
+        set_default_context(host='web-1')
+
+        with scientist_context(request_id='r1'):
+            self.assertEqual(
+                dict(default_scientist_context()),
+                {'host': 'web-1', 'request_id': 'r1'}
+            )
+            self.assertEqual(lookup('host'), 'web-1')
+
+    def test_snapshots_the_context_once_per_run(self):
+        set_default_context(host='web-1')
+        self.ex.context = {'team': 'search'}
+
+        with scientist_context(request_id='r1'):
+            self.ex.run()
+
+        self.ex.context = {'team': 'other'}
+        result = self.published[0]
+        self.assertEqual(
+            dict(result.context),
+            {'host': 'web-1', 'request_id': 'r1', 'team': 'search'}
+        )
+        self.assertIs(result.context, result.context)
+
+        with self.assertRaises(TypeError):
+            result.context['team'] = 'mutated'
+
+    def test_experiment_context_wins_over_ambient_values(self):
+        self.ex.context = {'tenant': 'experiment'}
+
+        with scientist_context(tenant='ambient'):
+            self.ex.run()
+
+        self.assertEqual(self.published[0].context['tenant'], 'experiment')
+
+    def test_propagates_to_pool_threads(self):
+        seen = []
+        pool = CandidatePool(max_workers=1)
+        self.ex.candidate_pool = pool
+        self.ex.behaviors['candidate'] = lambda: seen.append(lookup('request_id'))
+
+        with scientist_context(request_id='r1'):
+            self.ex.run()
+        pool.shutdown()
+
+        self.assertEqual(seen, ['r1'])
+
+    def test_propagates_to_the_background_worker(self):
+        seen = []
+        worker = BackgroundWorker()
+        self.ex.background_worker = worker
+        self.ex.behaviors['candidate'] = lambda: seen.append(lookup('request_id'))
+
+        with scientist_context(request_id='r1'):
+            self.ex.run()
+        worker.flush(5)
+        worker.shutdown()
+
+        self.assertEqual(seen, ['r1'])
+        self.assertEqual(self.published[0].context['request_id'], 'r1')
+
+    def test_propagates_to_asyncio_candidates(self):
+        seen = []
+        ex = AsyncDefaultExperiment('context')
+        ex.publish = self.published.append
+
+        async def candidate():
+            seen.append(lookup('request_id'))
+
+        async def main():
+            with scientist_context(request_id='r1'):
+                ex.use(lambda: 'control')
+                ex.try_candidate(candidate)
+                await ex.run()
+
+        asyncio.run(main())
+
+        self.assertEqual(seen, ['r1'])
+        self.assertEqual(self.published[0].context['request_id'], 'r1')
+
+    def test_samples_by_an_ambient_key(self):
+        for user_id in range(50):
+            ex = DefaultExperiment('sampled', percent=50, sample_key='user_id')
+            with scientist_context(user_id=user_id):
+                decision = ex.is_enabled()
+            ex.context = {'user_id': user_id}
+            self.assertEqual(ex.is_enabled(), decision)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+from .. import experiment, Experiment
+
+import inspect
+import unittest
+
+
+class TestExperimentDecorator(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.published = []
+
+    def test_turns_the_function_into_the_control(self):
+        def new_add(a, b=0):
+            self.calls.append(('candidate', a, b))
+            return b + a
+
+        @experiment('add', candidate=new_add, publish=self.published.append)
+        def add(a, b=0):
+            """Add two numbers."""
+            self.calls.append(('control', a, b))
+            return a + b
+
+        self.assertEqual(add(1, b=2), 3)
+        self.assertEqual(sorted(self.calls), [('candidate', 1, 2), ('control', 1, 2)])
+        self.assertEqual(self.published[0].candidates[0].returned_value, 3)
+
+    def test_preserves_the_metadata_and_signature(self):
+        @experiment('add', candidate=lambda a, b=0: a + b)
+        def add(a, b=0):
+            """Add two numbers."""
+            return a + b
+
+        self.assertEqual(add.__name__, 'add')
+        self.assertEqual(add.__doc__, 'Add two numbers.')
+        self.assertEqual(str(inspect.signature(add)), '(a, b=0)')
+        self.assertIsInstance(add.experiment, Experiment)
+
+    def test_registers_candidates_on_the_decorated_function(self):
+        @experiment('add', publish=self.published.append)
+        def add(a, b=0):
+            return a + b
+
+        @add.candidate
+        def loop_add(a, b=0):
+            return sum([a, b])
+
+        @add.candidate('negated')
+        def negated_add(a, b=0):
+            return -(-a - b)
+
+        self.assertEqual(add(2, 3), 5)
+        self.assertEqual(
+            sorted(o.name for o in self.published[0].candidates),
+            ['loop_add', 'negated']
+        )
+        self.assertEqual(loop_add(1, 1), 2)
+
+    def test_calls_only_the_control_when_disabled(self):
+        @experiment('add', candidate=lambda a, b: self.calls.append('candidate'), enabled=False)
+        def add(a, b):
+            return a + b
+
+        self.assertEqual(add(1, 2), 3)
+        self.assertEqual(self.calls, [])
+
+        add.definition.enabled = True
+        add(1, 2)
+        self.assertEqual(self.calls, ['candidate'])
+
+    def test_works_on_methods(self):
+        class Calculator(object):
+            factor = 2
+
+            def new_scale(self, value):
+                return value * self.factor
+
+            @experiment('scale', candidate=new_scale)
+            def scale(self, value):
+                return self.factor * value
+
+        self.assertEqual(Calculator().scale(4), 8)
+
+    def test_raises_control_exceptions(self):
+        @experiment('divide', candidate=lambda a, b: 0)
+        def divide(a, b):
+            return a / b
+
+        with self.assertRaises(ZeroDivisionError):
+            divide(1, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
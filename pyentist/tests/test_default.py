@@ -37,5 +37,50 @@ class TestDefault(unittest.TestCase):
 
         self.assertEqual('kaboom', str(e.exception))
 
+
+class TestDefaultSampling(unittest.TestCase):
+
+    def test_never_enabled_at_zero_percent(self):
+        ex = DefaultExperiment('sampled', percent=0)
+        self.assertFalse(any(ex.is_enabled() for _ in range(1000)))
+
+    def test_samples_randomly_without_a_key(self):
+        ex = DefaultExperiment('sampled', percent=50)
+        decisions = set(ex.is_enabled() for _ in range(1000))
+        self.assertEqual(decisions, {True, False})
+
+    def test_samples_by_context_key(self):
+        ex = DefaultExperiment('sampled', percent=50, sample_key='user_id')
+        enrolled = 0
+
+        for user_id in range(1000):
+            ex.context = {'user_id': user_id}
+            decision = ex.is_enabled()
+            self.assertTrue(all(ex.is_enabled() == decision for _ in range(5)))
+            enrolled += decision
+
+        self.assertGreater(enrolled, 400)
+        self.assertLess(enrolled, 600)
+
+    def test_the_same_key_lands_on_the_same_side_across_instances(self):
+        a = DefaultExperiment('sampled', percent=10, sample_key='user_id')
+        b = DefaultExperiment('sampled', percent=10, sample_key='user_id')
+
+        for user_id in range(100):
+            a.context = {'user_id': user_id}
+            b.context = {'user_id': user_id}
+            self.assertEqual(a.is_enabled(), b.is_enabled())
+
+    def test_does_not_observe_unsampled_calls(self):
+        ran = []
+        ex = DefaultExperiment('sampled', percent=0)
+        ex.publish = ran.append
+        ex.use(lambda: 'control')
+        ex.try_candidate(lambda: ran.append('candidate'))
+
+        self.assertEqual(ex.run(), 'control')
+        self.assertEqual(ran, [])
+        self.assertIsNone(ex.result)
+
 if __name__ == '__main__':
     unittest.main()
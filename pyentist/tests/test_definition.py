@@ -0,0 +1,95 @@
+from .. import CandidatePool, ExperimentDefinition, define
+
+import unittest
+
+
+class TestExperimentDefinition(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.published = []
+
+    def control(self, x, y=1):
+        self.calls.append(('control', x, y))
+        return x * y
+
+    def candidate(self, x, y=1):
+        self.calls.append(('candidate', x, y))
+        return sum(x for _ in range(y))
+
+    def test_define_builds_a_definition(self):
+        definition = define('multiply', self.control, candidates=self.candidate)
+
+        self.assertIsInstance(definition, ExperimentDefinition)
+        self.assertEqual(definition.name, 'multiply')
+        self.assertEqual(sorted(definition.experiment.behaviors), ['candidate', 'control'])
+
+    def test_passes_call_arguments_to_every_behavior(self):
+        definition = define(
+            'multiply', self.control,
+            candidates={'loop': self.candidate},
+            comparer=lambda a, b: a.returned_value == b.returned_value,
+            publish=self.published.append,
+        )
+
+        self.assertEqual(definition(3, y=4), 12)
+        self.assertEqual(
+            sorted(self.calls),
+            [('candidate', 3, 4), ('control', 3, 4)]
+        )
+        self.assertTrue(self.published[0].was_matched)
+
+    def test_can_be_called_many_times(self):
+        definition = define('multiply', self.control, candidates=self.candidate,
+                            publish=self.published.append)
+
+        self.assertEqual([definition(x) for x in range(5)], list(range(5)))
+        self.assertEqual(len(self.published), 5)
+
+    def test_calls_only_the_control_when_disabled(self):
+        definition = define('multiply', self.control, candidates=self.candidate,
+                            enabled=False, publish=self.published.append)
+
+        self.assertEqual(definition(2, y=3), 6)
+        self.assertEqual(self.calls, [('control', 2, 3)])
+        self.assertEqual(self.published, [])
+
+    def test_can_be_switched_off_at_runtime(self):
+        definition = define('multiply', self.control, candidates=self.candidate)
+        definition.enabled = False
+
+        definition(2)
+        self.assertEqual(self.calls, [('control', 2, 1)])
+
+    def test_honours_percent(self):
+        definition = define('multiply', self.control, candidates=self.candidate, percent=0)
+
+        definition(2)
+        self.assertEqual(self.calls, [('control', 2, 1)])
+
+    def test_applies_cleaner_ignorers_and_context(self):
+        definition = define(
+            'multiply', self.control, candidates=lambda x, y=1: -x * y,
+            cleaner=abs, ignorers=[lambda a, b: True], context={'team': 'search'},
+            publish=self.published.append,
+        )
+
+        definition(2)
+        result = self.published[0]
+        self.assertTrue(result.was_ignored)
+        self.assertEqual(result.context, {'team': 'search'})
+        self.assertEqual(result.candidates[0].cleaned_value, 2)
+
+    def test_passes_arguments_to_pooled_candidates(self):
+        pool = CandidatePool(max_workers=1)
+        definition = define('multiply', self.control, candidates=self.candidate,
+                            publish=self.published.append)
+        definition.experiment.candidate_pool = pool
+
+        self.assertEqual(definition(3, y=2), 6)
+        pool.shutdown()
+        self.assertEqual(self.published[0].candidates[0].returned_value, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+from .. import DefaultExperiment, CandidatePool, ProcessCandidatePool
+
+import functools
+import os
+import threading
+import unittest
+
+
+def square(value):
+    return value * value
+
+
+def divide(value):
+    return 1 / value
+
+
+def payload(value):
+    return {'a': value, 'pid': os.getpid()}
+
+
+def first_field(value):
+    return value['a']
+
+
+def process_id():
+    return os.getpid()
+
+
+class TestCandidatePool(unittest.TestCase):
+
+    def setUp(self):
+        self.ex = DefaultExperiment('pool')
+        self.pool = CandidatePool(max_workers=4)
+        self.ex.candidate_pool = self.pool
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_rejects_unknown_when_full_policy(self):
+        with self.assertRaises(ValueError):
+            CandidatePool(when_full='drop')
+
+    def test_runs_control_on_the_callers_thread(self):
+        threads = {}
+
+        self.ex.use(lambda: threads.setdefault('control', threading.current_thread()) and 'control')
+        self.ex.try_candidate(lambda: threads.setdefault('candidate', threading.current_thread()) and 'candidate')
+
+        self.assertEqual(self.ex.run(), 'control')
+        self.assertIs(threads['control'], threading.current_thread())
+        self.assertIsNot(threads['candidate'], threading.current_thread())
+
+    def test_runs_candidates_concurrently_with_control(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        self.ex.use(lambda: barrier.wait() and 'control' or 'control')
+        self.ex.try_candidate('a', lambda: barrier.wait() and 'a' or 'a')
+        self.ex.try_candidate('b', lambda: barrier.wait() and 'b' or 'b')
+
+        self.assertEqual(self.ex.run(), 'control')
+        self.assertEqual(
+            sorted(o.name for o in self.ex.result.candidates),
+            ['a', 'b']
+        )
+        self.assertFalse(any(o.raised_exception for o in self.ex.result.observations))
+
+    def test_records_candidate_exceptions(self):
+        self.ex.use(lambda: 1)
+        self.ex.try_candidate(lambda: 1 / 0)
+
+        self.assertEqual(self.ex.run(), 1)
+        (candidate,) = self.ex.result.candidates
+        self.assertIsInstance(candidate.raised_exception, ZeroDivisionError)
+
+    def test_skips_candidates_when_the_pool_is_full(self):
+        release = threading.Event()
+        pool = CandidatePool(max_workers=1, max_pending=1, when_full=CandidatePool.SKIP)
+        busy = pool.submit(release.wait, 5)
+
+        self.ex.candidate_pool = pool
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(lambda: 'candidate')
+
+        self.assertEqual(self.ex.run(), 'control')
+        self.assertEqual(self.ex.result.candidates, ())
+        self.assertEqual(pool.skipped, 1)
+
+        release.set()
+        busy.result()
+        pool.shutdown()
+
+    def test_blocks_until_a_slot_is_free_when_the_pool_is_full(self):
+        release = threading.Event()
+        pool = CandidatePool(max_workers=1, max_pending=1, when_full=CandidatePool.BLOCK)
+        pool.submit(release.wait, 5)
+
+        self.ex.candidate_pool = pool
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(lambda: 'candidate')
+
+        threading.Timer(0.05, release.set).start()
+
+        self.assertEqual(self.ex.run(), 'control')
+        (candidate,) = self.ex.result.candidates
+        self.assertEqual(candidate.returned_value, 'candidate')
+        self.assertEqual(pool.skipped, 0)
+        pool.shutdown()
+
+
+class TestProcessCandidatePool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ProcessCandidatePool(max_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def setUp(self):
+        self.raised = []
+        self.ex = DefaultExperiment('process')
+        self.ex.candidate_pool = self.pool
+        self.ex.raised = lambda operation, error: self.raised.append((operation, error))
+
+    def test_runs_candidates_in_another_process(self):
+        self.ex.use(os.getpid)
+        self.ex.try_candidate(process_id)
+
+        self.assertEqual(self.ex.run(), os.getpid())
+        (candidate,) = self.ex.result.candidates
+        self.assertNotEqual(candidate.returned_value, os.getpid())
+        self.assertIsNotNone(candidate.duration)
+
+    def test_sends_arguments_with_the_callable(self):
+        self.ex.use(functools.partial(square, 4))
+        self.ex.try_candidate(functools.partial(square, 4))
+
+        self.assertEqual(self.ex.run(), 16)
+        (candidate,) = self.ex.result.candidates
+        self.assertEqual(candidate.returned_value, 16)
+
+    def test_ships_back_the_cleaned_value(self):
+        self.ex.cleaner = str
+        self.ex.use(functools.partial(square, 3))
+        self.ex.try_candidate(functools.partial(square, 3))
+
+        self.ex.run()
+        (candidate,) = self.ex.result.candidates
+        self.assertEqual(candidate.cleaned_value, '9')
+
+    def test_compares_cleaned_values_on_both_sides(self):
+        ignored = []
+        self.ex.cleaner = first_field
+        self.ex.use(functools.partial(payload, 1))
+        self.ex.try_candidate('same', functools.partial(payload, 1))
+        self.ex.try_candidate('different', functools.partial(payload, 2))
+        self.ex.add_ignorer(lambda control, candidate: ignored.append((control, candidate)))
+
+        self.ex.run()
+        self.assertEqual([o.name for o in self.ex.result.mismatched], ['different'])
+        self.assertEqual(ignored, [(1, 2)])
+
+    def test_records_candidate_exceptions(self):
+        self.ex.use(functools.partial(square, 0))
+        self.ex.try_candidate(functools.partial(divide, 0))
+
+        self.assertEqual(self.ex.run(), 0)
+        (candidate,) = self.ex.result.candidates
+        self.assertIsInstance(candidate.raised_exception, ZeroDivisionError)
+
+    def test_drops_candidates_that_cannot_be_pickled(self):
+        self.ex.use(lambda: 1)
+        self.ex.try_candidate(lambda: 1)
+
+        self.assertEqual(self.ex.run(), 1)
+        self.assertEqual(self.ex.result.candidates, ())
+        self.assertEqual([operation for operation, _ in self.raised], ['candidate_pool'])
+
+    def test_drops_candidates_when_the_cleaner_cannot_be_pickled(self):
+        self.ex.cleaner = lambda value: value
+        self.ex.use(functools.partial(square, 2))
+        self.ex.try_candidate(functools.partial(square, 2))
+
+        self.assertEqual(self.ex.run(), 4)
+        self.assertEqual(self.ex.result.candidates, ())
+        self.assertFalse(self.ex.result.was_mismatched)
+        self.assertEqual([operation for operation, _ in self.raised], ['candidate_pool'])
+
+    def test_reports_cleaner_errors_from_the_worker(self):
+        self.ex.cleaner = first_field
+        self.ex.use(functools.partial(payload, 3))
+        self.ex.try_candidate(functools.partial(square, 3))
+
+        self.ex.run()
+        (candidate,) = self.ex.result.candidates
+        self.assertEqual(candidate.cleaned_value, 9)
+        self.assertEqual([o.name for o in self.ex.result.mismatched], ['candidate'])
+        self.assertEqual([operation for operation, _ in self.raised], ['cleaner'])
+        self.assertIsInstance(self.raised[0][1], TypeError)
+
+
+if __name__ == '__main__':
+    unittest.main()
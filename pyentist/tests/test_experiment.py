@@ -18,6 +18,32 @@ class TestExperiment(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             ex.publish('result')
 
+    def test_subclasses_without_experiment_init_still_work(self):
+        published = []
+
+        class LegacyExperiment(Experiment):
+
+            def __init__(self, name):
+                self.name = name
+
+            def is_enabled(self):
+                return True
+
+            def publish(self, result):
+                published.append(result)
+
+        ex = LegacyExperiment('legacy')
+        ex.context = {'user': 1}
+        ex.use(lambda: 1)
+        ex.try_candidate(lambda: 2)
+        ex.add_ignorer(lambda control, candidate: True)
+
+        self.assertEqual(ex.run(), 1)
+        self.assertTrue(published[0].was_ignored)
+        self.assertEqual(published[0].context, {'user': 1})
+        with self.assertRaises(AttributeError):
+            ex.missing
+
 
 class TestFakeExperiment(unittest.TestCase):
 
@@ -175,6 +201,10 @@ class TestFakeExperiment(unittest.TestCase):
         self.ex.comparer = bad_comparer
 
         self.assertEqual(self.ex.run(), 'control')
+        self.assertEqual(self.ex.exceptions, [])
+
+        # Results are compared on first access
+        self.assertTrue(self.ex.published_result.was_mismatched)
         (operation, exception) = self.ex.exceptions.pop()
 
         self.assertEqual('comparer', operation)
@@ -0,0 +1,245 @@
+from .. import DefaultExperiment, CandidatePool, ProcessCandidatePool, to_record
+from ..comparers import numpy
+from ..fingerprint import fingerprint
+
+import array
+import gc
+import unittest
+import weakref
+
+
+class Payload(object):
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Slotted(object):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+
+def large():
+    return {'rows': list(range(1000))}
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_equal_values_share_a_fingerprint(self):
+        self.assertEqual(
+            fingerprint({'a': [1, 2.0], 'b': 'x'}), fingerprint({'b': 'x', 'a': [1, 2.0]})
+        )
+        self.assertEqual(fingerprint({1, 2, 3}), fingerprint({3, 2, 1}))
+        self.assertEqual(fingerprint(float('nan')), fingerprint(float('nan')))
+        self.assertEqual(fingerprint(Payload([1])), fingerprint(Payload([1])))
+        self.assertEqual(fingerprint({1: 'a', 'b': 2}), fingerprint({'b': 2, 1: 'a'}))
+
+    def test_different_values_have_different_fingerprints(self):
+        values = [
+            None, True, False, 0, 1, 1.0, 1.5, '', '1', b'1', [], (), {}, set(), [1], (1,),
+            [1.0], [True], [2 ** 70],
+            ['a', 'b'], ['ab'], {'a': 1}, {'a': '1'}, Payload(1), Payload('1'),
+        ]
+        fingerprints = set(fingerprint(value) for value in values)
+
+        self.assertEqual(len(fingerprints), len(values))
+
+    def test_encodes_buffers_by_their_contents(self):
+        a = array.array('d', range(5000))
+        b = array.array('d', range(5000))
+        b[2500] = -1
+
+        self.assertEqual(fingerprint(a), fingerprint(array.array('d', range(5000))))
+        self.assertNotEqual(fingerprint(a), fingerprint(b))
+        self.assertNotEqual(fingerprint(a), fingerprint(array.array('q', range(5000))))
+        flat = memoryview(bytearray(8))
+        self.assertNotEqual(fingerprint(flat), fingerprint(flat.cast('B', (2, 4))))
+
+    @unittest.skipUnless(numpy is not None, 'numpy is not installed')
+    def test_encodes_arrays_by_shape_dtype_and_bytes(self):
+        a = numpy.arange(5000.0)
+        b = a.copy()
+        b[2500] = -1
+
+        self.assertEqual(fingerprint(a), fingerprint(a.copy()))
+        self.assertNotEqual(fingerprint(a), fingerprint(b))
+        self.assertNotEqual(fingerprint(a), fingerprint(a.reshape(50, 100)))
+        self.assertNotEqual(fingerprint(a), fingerprint(a.astype(numpy.float32)))
+        self.assertEqual(fingerprint(a[::2]), fingerprint(a[::2].copy()))
+        with self.assertRaises(TypeError):
+            fingerprint(numpy.array([None]))
+
+    def test_refuses_values_without_a_canonical_encoding(self):
+        for value in (object(), Slotted(1), [1, {'a': Slotted(1)}], {Slotted(1)}):
+            with self.assertRaises(TypeError):
+                fingerprint(value)
+
+    def test_orders_unsortable_keys_deterministically(self):
+        self.assertEqual(
+            fingerprint({1: 'a', 'b': 2, (3,): None}), fingerprint({(3,): None, 'b': 2, 1: 'a'})
+        )
+
+    def test_orders_partially_ordered_keys_deterministically(self):
+        keys = [frozenset([1]), frozenset([2]), frozenset([1, 2])]
+        forward = dict((key, len(key)) for key in keys)
+        backward = dict((key, len(key)) for key in reversed(keys))
+
+        self.assertEqual(fingerprint(forward), fingerprint(backward))
+
+    def test_equal_zeros_share_a_fingerprint(self):
+        self.assertEqual(fingerprint(-0.0), fingerprint(0.0))
+        self.assertEqual(fingerprint({'a': [-0.0]}), fingerprint({'a': [0.0]}))
+
+    def test_handles_deep_nesting(self):
+        value = None
+        for _ in range(10000):
+            value = [value]
+
+        self.assertEqual(len(fingerprint(value)), 32)
+
+
+class TestFingerprintedExperiment(unittest.TestCase):
+
+    def setUp(self):
+        self.published = []
+        self.ex = DefaultExperiment('fingerprinted')
+        self.ex.fingerprint_values = True
+        self.ex.publish = self.published.append
+        self.ex.use(large)
+
+    def test_compares_fingerprints_and_releases_values(self):
+        self.ex.try_candidate('same', large)
+        self.ex.try_candidate('different', lambda: {'rows': []})
+
+        self.assertEqual(self.ex.run(), large())
+        result = self.published[0]
+        self.assertEqual([o.name for o in result.mismatched], ['different'])
+        for observation in result.observations:
+            self.assertTrue(observation.released)
+            self.assertIsNone(observation.returned_value)
+            self.assertIsNotNone(observation.fingerprint)
+
+    def test_releases_returned_objects(self):
+        references = []
+
+        def candidate():
+            payload = Payload(1)
+            references.append(weakref.ref(payload))
+            return payload
+
+        self.ex.try_candidate(candidate)
+        self.ex.run()
+        gc.collect()
+
+        self.assertIsNone(references[0]())
+
+    def test_releases_candidates_as_soon_as_they_return(self):
+        references = []
+        alive_during_control = []
+
+        def candidate():
+            payload = Payload(1)
+            references.append(weakref.ref(payload))
+            return payload
+
+        def control():
+            if references:
+                gc.collect()
+                alive_during_control.append(references[-1]() is not None)
+            return Payload(1)
+
+        self.ex = DefaultExperiment('fingerprinted')
+        self.ex.fingerprint_values = True
+        self.ex.use(control)
+        self.ex.try_candidate(candidate)
+        while not alive_during_control:
+            del references[:]
+            self.ex.run()
+
+        self.assertEqual(alive_during_control, [False])
+        self.assertTrue(self.ex.result.was_matched)
+
+    def test_compares_values_that_cannot_be_fingerprinted(self):
+        self.ex = DefaultExperiment('fingerprinted')
+        self.ex.fingerprint_values = True
+        self.ex.publish = self.published.append
+        self.ex.use(lambda: Slotted(1))
+        self.ex.try_candidate('same', lambda: Slotted(1))
+        self.ex.try_candidate('different', lambda: Slotted(2))
+        self.ex.run()
+
+        result = self.published[0]
+        self.assertEqual([o.name for o in result.mismatched], ['different'])
+        for observation in result.observations:
+            self.assertFalse(observation.released)
+            self.assertIsNone(observation.fingerprint)
+
+    def test_uses_the_cleaner(self):
+        self.ex.cleaner = lambda value: len(value['rows'])
+        self.ex.try_candidate(lambda: {'rows': [None] * 1000})
+        self.ex.run()
+
+        self.assertTrue(self.published[0].was_matched)
+
+    def test_ignorers_see_the_values(self):
+        self.ex.try_candidate(lambda: {'rows': []})
+        self.ex.add_ignorer(lambda control, candidate: candidate == {'rows': []})
+        self.ex.run()
+
+        self.assertTrue(self.published[0].was_ignored)
+
+    def test_keeps_mismatched_values_when_asked(self):
+        self.ex.keep_mismatched_values = True
+        self.ex.try_candidate('same', large)
+        self.ex.try_candidate('different', lambda: {'rows': []})
+        self.ex.run()
+
+        observations = dict((o.name, o) for o in self.published[0].observations)
+        self.assertTrue(observations['same'].released)
+        self.assertEqual(observations['different'].returned_value, {'rows': []})
+        self.assertEqual(observations['control'].returned_value, large())
+        self.assertEqual(
+            self.published[0].differences['different'][0][0], "['rows']"
+        )
+
+    def test_records_carry_the_fingerprint(self):
+        self.ex.try_candidate(large)
+        self.ex.run()
+
+        record = to_record(self.published[0])
+        self.assertEqual(record['observations'][0]['digest'], fingerprint(large()))
+
+    def test_fingerprints_in_thread_pools(self):
+        pool = CandidatePool(max_workers=2)
+        self.addCleanup(pool.shutdown)
+        self.ex.candidate_pool = pool
+        self.ex.try_candidate(large)
+        self.ex.run()
+
+        self.assertTrue(self.published[0].was_matched)
+
+    def test_process_pools_ship_only_fingerprints(self):
+        pool = ProcessCandidatePool(max_workers=1)
+        self.addCleanup(pool.shutdown)
+
+        observation = pool.observe(self.ex, 'candidate', large).result(10)
+        self.assertTrue(observation.released)
+        self.assertIsNone(observation.returned_value)
+        self.assertEqual(observation.fingerprint, fingerprint(large()))
+
+        self.ex.keep_mismatched_values = True
+        observation = pool.observe(self.ex, 'candidate', large).result(10)
+        self.assertFalse(observation.released)
+        self.assertEqual(observation.returned_value, large())
+
+
+if __name__ == '__main__':
+    unittest.main()
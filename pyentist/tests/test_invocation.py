@@ -0,0 +1,128 @@
+from .. import DefaultExperiment, Invocation, MismatchError
+
+import importlib
+import sys
+import threading
+import unittest
+
+
+class TestInvocation(unittest.TestCase):
+
+    def setUp(self):
+        self.published = []
+        self.ex = DefaultExperiment('shared')
+        self.ex.publish = self.published.append
+        self.ex.comparer = lambda a, b: a.returned_value == b.returned_value
+        self.ex.use(lambda x: x * 2)
+        self.ex.try_candidate(lambda x: x + x)
+
+    def test_invoke_returns_the_run_state(self):
+        invocation = self.ex.invoke('control', (21,))
+
+        self.assertIsInstance(invocation, Invocation)
+        self.assertEqual(invocation.value(), 42)
+        self.assertEqual(invocation.control.returned_value, 42)
+        self.assertIs(invocation.result, self.published[0])
+        self.assertTrue(invocation.result.was_matched)
+
+    def test_invoke_leaves_the_experiment_untouched(self):
+        self.ex.invoke('control', (1,))
+
+        self.assertIsNone(self.ex.result)
+        self.assertIsNone(self.ex.returned_value)
+
+    def test_invoke_keeps_the_control_exception(self):
+        self.ex.behaviors['control'] = lambda x: 1 / x
+        invocation = self.ex.invoke('control', (0,))
+
+        self.assertIsInstance(invocation.raised_exception, ZeroDivisionError)
+        with self.assertRaises(ZeroDivisionError):
+            invocation.value()
+
+    def test_invoke_keeps_the_value_when_disabled(self):
+        self.ex.percent = 0
+        invocation = self.ex.invoke('control', (2,))
+
+        self.assertEqual(invocation.value(), 4)
+        self.assertIsNone(invocation.result)
+        self.assertEqual(self.published, [])
+
+    def test_invoke_raises_on_mismatch(self):
+        self.ex.should_raise_on_mismatch = True
+        self.ex.behaviors['candidate'] = lambda x: x
+
+        with self.assertRaises(MismatchError):
+            self.ex.invoke('control', (2,))
+
+    def test_run_still_records_the_last_run(self):
+        self.assertEqual(self.ex.run('control', (3,)), 6)
+        self.assertEqual(self.ex.returned_value, 6)
+        self.assertIs(self.ex.result, self.published[0])
+
+    def test_one_experiment_serves_many_threads(self):
+        errors = []
+
+        def work(offset):
+            for x in range(offset, offset + 200):
+                invocation = self.ex.invoke('control', (x,))
+                if invocation.value() != x * 2 or invocation.result.control.returned_value != x * 2:
+                    errors.append(x)
+                if not invocation.result.was_matched:
+                    errors.append(x)
+
+        threads = [threading.Thread(target=work, args=(i * 1000,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.published), 1600)
+
+    def test_context_updates_replace_the_mapping(self):
+        self.ex.context = {'a': 1}
+        before = self.ex.context
+
+        self.ex.context = {'b': 2}
+
+        self.assertEqual(before, {'a': 1})
+        self.assertEqual(self.ex.context, {'a': 1, 'b': 2})
+
+    def test_concurrent_context_updates_are_all_kept(self):
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+
+        def work(offset):
+            for key in range(offset, offset + 200):
+                self.ex.context = {key: True}
+
+        threads = [threading.Thread(target=work, args=(i * 1000,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.ex.context), 1600)
+
+    def test_unsampled_calls_are_checked_before_allocating(self):
+        events = []
+
+        class RecordedInvocation(Invocation):
+            __slots__ = ()
+
+            def __init__(self, *args):
+                events.append('invocation')
+                super(RecordedInvocation, self).__init__(*args)
+
+        experiment_module = importlib.import_module('..experiment', __package__)
+        self.addCleanup(setattr, experiment_module, 'Invocation', Invocation)
+        experiment_module.Invocation = RecordedInvocation
+        self.ex.is_enabled = lambda: events.append('sampled')
+
+        self.assertEqual(self.ex.invoke('control', (2,)).value(), 4)
+        self.assertEqual(events, ['sampled', 'invocation'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+from .. import (
+    Aggregator, DefaultExperiment, Observation, ProcessCandidatePool, to_record
+)
+from .. import metrics
+from ..metrics import CPU, GC, MEMORY
+
+import gc
+import time
+import tracemalloc
+import unittest
+
+
+def allocate():
+    return [object() for _ in range(1000)]
+
+
+def spin():
+    deadline = time.perf_counter() + 0.01
+    while time.perf_counter() < deadline:
+        pass
+    return 1
+
+
+def collect():
+    gc.collect()
+    return 1
+
+
+class TestObservationTiming(unittest.TestCase):
+
+    def setUp(self):
+        self.ex = DefaultExperiment('metrics')
+
+    def test_durations_are_monotonic_nanoseconds(self):
+        observation = Observation('control', self.ex, spin)
+
+        self.assertIsInstance(observation.duration_ns, int)
+        self.assertGreaterEqual(observation.duration_ns, 10 ** 7)
+        self.assertEqual(observation.duration, observation.duration_ns / 1e9)
+
+    def test_metrics_are_off_by_default(self):
+        observation = Observation('control', self.ex, spin)
+
+        self.assertIsNone(observation.metrics)
+
+    def test_from_outcome_converts_durations(self):
+        observation = Observation.from_outcome('candidate', self.ex, 1, duration=0.5)
+
+        self.assertEqual(observation.duration_ns, 500000000)
+        self.assertIsNone(observation.metrics)
+
+
+class TestResourceMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.tracing = tracemalloc.is_tracing()
+        self.ex = DefaultExperiment('metrics')
+
+    def tearDown(self):
+        if not self.tracing:
+            tracemalloc.stop()
+
+    def test_measures_cpu_time(self):
+        observation = Observation('control', self.ex, spin, metrics=(CPU,))
+
+        self.assertGreater(observation.metrics['cpu_ns'], 0)
+        self.assertNotIn('allocated_bytes', observation.metrics)
+
+    def test_measures_allocations(self):
+        observation = Observation('control', self.ex, allocate, metrics=(MEMORY,))
+
+        self.assertGreater(observation.metrics['allocated_bytes'], 1000 * 16)
+        if hasattr(tracemalloc, 'reset_peak'):
+            self.assertGreaterEqual(
+                observation.metrics['peak_bytes'], observation.metrics['allocated_bytes']
+            )
+
+    def test_traces_only_while_measuring(self):
+        if self.tracing:
+            tracemalloc.stop()
+        seen = []
+
+        def traced():
+            seen.append(tracemalloc.is_tracing())
+            return allocate()
+
+        Observation('control', self.ex, traced, metrics=(MEMORY,))
+
+        self.assertEqual(seen, [True])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_leaves_tracing_it_did_not_start(self):
+        tracemalloc.start()
+        Observation('control', self.ex, allocate, metrics=(MEMORY,))
+
+        self.assertTrue(tracemalloc.is_tracing())
+
+    def test_overlapping_measurements_do_not_report_the_peak(self):
+        outer = metrics.start((MEMORY,))
+        inner = Observation('control', self.ex, allocate, metrics=(MEMORY,))
+        measured = metrics.stop(outer)
+
+        self.assertNotIn('peak_bytes', inner.metrics)
+        self.assertIn('allocated_bytes', inner.metrics)
+        if hasattr(tracemalloc, 'reset_peak'):
+            self.assertIn('peak_bytes', measured)
+
+    def test_counts_gc_collections(self):
+        observation = Observation('control', self.ex, collect, metrics=(GC,))
+
+        self.assertGreaterEqual(observation.metrics['gc_collections'], 1)
+
+    def test_experiment_metrics_reach_the_result(self):
+        self.ex.metrics = (CPU, MEMORY, GC)
+        self.ex.aggregator = Aggregator()
+        self.ex.use(spin)
+        self.ex.try_candidate(allocate)
+        self.ex.run()
+
+        for observation in self.ex.result.observations:
+            self.assertEqual(
+                set(observation.metrics) - set(['peak_bytes']),
+                set(['cpu_ns', 'allocated_bytes', 'gc_collections']),
+            )
+
+        record = to_record(self.ex.result)
+        self.assertIn('cpu_ns', record['observations'][0]['metrics'])
+
+        snapshot = self.ex.aggregator.snapshot()['experiments']['metrics']
+        self.assertGreater(snapshot['control']['metrics']['cpu_ns'], 0)
+        self.assertGreater(snapshot['candidates']['candidate']['metrics']['allocated_bytes'], 0)
+
+    def test_process_pool_ships_metrics(self):
+        pool = ProcessCandidatePool(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        self.ex.metrics = (CPU,)
+
+        observation = pool.observe(self.ex, 'candidate', spin).result(10)
+
+        self.assertEqual(observation.returned_value, 1)
+        self.assertGreater(observation.metrics['cpu_ns'], 0)
+        self.assertGreaterEqual(observation.duration, 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+from .. import BatchingPublisher, StreamPublisher, FilePublisher, DefaultExperiment, iter_records
+
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+
+class ListPublisher(BatchingPublisher):
+
+    def __init__(self, **options):
+        super(ListPublisher, self).__init__(**options)
+        self.batches_seen = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def publish_batch(self, results):
+        self.release.wait(5)
+        self.batches_seen.append(list(results))
+
+
+def make_result(name='experiment'):
+    e = DefaultExperiment(name)
+    e.use(lambda: 1)
+    e.try_candidate(lambda: 2)
+    e.comparer = lambda a, b: a.returned_value == b.returned_value
+    e.run()
+    return e.result
+
+
+class TestBatchingPublisher(unittest.TestCase):
+
+    def tearDown(self):
+        self.publisher.shutdown()
+
+    def test_rejects_unknown_overflow_policy(self):
+        self.publisher = ListPublisher()
+        with self.assertRaises(ValueError):
+            ListPublisher(overflow='drop_all')
+
+    def test_flushes_full_batches(self):
+        self.publisher = ListPublisher(max_batch=2, max_age=60)
+        for value in range(4):
+            self.publisher(value)
+
+        self.assertTrue(self.publisher.flush(5))
+        self.assertEqual(self.publisher.batches_seen, [[0, 1], [2, 3]])
+        self.assertEqual(self.publisher.published, 4)
+
+    def test_flushes_old_results(self):
+        self.publisher = ListPublisher(max_batch=100, max_age=0.01)
+        self.publisher.publish('result')
+
+        with self.publisher._condition:
+            self.publisher._condition.wait_for(lambda: self.publisher.batches, 5)
+        self.assertEqual(self.publisher.batches_seen, [['result']])
+
+    def test_flushes_old_results_after_the_buffer_drained(self):
+        self.publisher = ListPublisher(max_batch=100, max_age=0.05)
+        condition = self.publisher._condition
+
+        for expected in (1, 2, 3):
+            self.publisher.publish(expected)
+            with condition:
+                self.assertTrue(condition.wait_for(lambda: self.publisher.batches == expected, 1))
+
+        self.assertEqual(self.publisher.batches_seen, [[1], [2], [3]])
+
+    def test_flush_publishes_partial_batches(self):
+        self.publisher = ListPublisher(max_batch=100, max_age=60)
+        self.publisher.publish('result')
+
+        self.assertTrue(self.publisher.flush(5))
+        self.assertEqual(self.publisher.batches_seen, [['result']])
+
+    def block(self):
+        self.publisher.release.clear()
+        self.publisher.publish('blocked')
+        with self.publisher._condition:
+            self.publisher._condition.wait_for(lambda: self.publisher._in_flight, 5)
+
+    def test_drops_newest_when_full(self):
+        self.publisher = ListPublisher(max_batch=1, max_buffer=1)
+        self.block()
+
+        self.assertTrue(self.publisher.publish('kept'))
+        self.assertFalse(self.publisher.publish('dropped'))
+        self.publisher.release.set()
+        self.publisher.flush(5)
+
+        self.assertEqual(self.publisher.batches_seen, [['blocked'], ['kept']])
+        self.assertEqual(self.publisher.dropped, 1)
+
+    def test_drops_oldest_when_full(self):
+        self.publisher = ListPublisher(
+            max_batch=1, max_buffer=1, overflow=BatchingPublisher.DROP_OLDEST
+        )
+        self.block()
+
+        self.assertTrue(self.publisher.publish('dropped'))
+        self.assertTrue(self.publisher.publish('kept'))
+        self.publisher.release.set()
+        self.publisher.flush(5)
+
+        self.assertEqual(self.publisher.batches_seen, [['blocked'], ['kept']])
+        self.assertEqual(self.publisher.dropped, 1)
+
+    def test_blocks_when_full(self):
+        self.publisher = ListPublisher(
+            max_batch=1, max_buffer=1, overflow=BatchingPublisher.BLOCK, block_timeout=0.01
+        )
+        self.block()
+
+        self.assertTrue(self.publisher.publish('kept'))
+        self.assertFalse(self.publisher.publish('timed out'))
+        self.assertEqual(self.publisher.dropped, 1)
+
+        threading.Timer(0.05, self.publisher.release.set).start()
+        self.publisher.block_timeout = 5
+        self.assertTrue(self.publisher.publish('waited'))
+        self.publisher.flush(5)
+
+        self.assertEqual(self.publisher.batches_seen, [['blocked'], ['kept'], ['waited']])
+
+    def test_counts_failed_batches(self):
+        self.publisher = ListPublisher(max_batch=2)
+        self.publisher.publish_batch = lambda results: 1 / 0
+        self.publisher.publish(1)
+        self.publisher.publish(2)
+
+        self.publisher.flush(5)
+        self.assertEqual(self.publisher.failed, 2)
+        self.assertEqual(self.publisher.published, 0)
+
+    def test_drops_after_shutdown(self):
+        self.publisher = ListPublisher()
+        self.publisher.publish('result')
+        self.publisher.shutdown()
+
+        self.assertFalse(self.publisher.publish('late'))
+        self.assertEqual(self.publisher.batches_seen, [['result']])
+        self.assertEqual(self.publisher.dropped, 1)
+
+    def test_receives_experiment_results(self):
+        self.publisher = ListPublisher(max_batch=1)
+        e = DefaultExperiment('exp')
+        e.publisher = self.publisher
+        e.use(lambda: 1)
+        e.try_candidate(lambda: 2)
+        e.run()
+
+        self.publisher.flush(5)
+        self.assertIs(self.publisher.batches_seen[0][0], e.result)
+
+    def test_evaluates_results_before_enqueueing_when_asked(self):
+        self.publisher = ListPublisher(evaluate=True)
+        self.publisher.release.clear()
+        e = DefaultExperiment('exp')
+        e.publisher = self.publisher
+        e.use(lambda: [1])
+        e.try_candidate(lambda: [2])
+        value = e.run()
+        value.append(3)
+
+        self.assertTrue(e.result.was_evaluated)
+        self.assertEqual(e.result.differences, {'candidate': [('[0]', 1, 2)]})
+        self.publisher.release.set()
+        self.assertTrue(self.publisher.flush(5))
+
+
+class TestStreamPublisher(unittest.TestCase):
+
+    def test_writes_json_records(self):
+        stream = io.StringIO()
+        publisher = StreamPublisher(stream)
+        publisher.publish(make_result('first'))
+        publisher.publish(make_result('second'))
+        publisher.shutdown()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([line['experiment'] for line in lines], ['first', 'second'])
+        statuses = dict((o['name'], o['status']) for o in lines[0]['observations'])
+        self.assertEqual(statuses, {'control': 'control', 'candidate': 'mismatched'})
+
+    def test_file_publisher_appends(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        for name in ('first', 'second'):
+            publisher = FilePublisher(path, binary=True)
+            publisher.publish(make_result(name))
+            publisher.shutdown()
+
+        with open(path, 'rb') as f:
+            records = list(iter_records(f, binary=True))
+        self.assertEqual([record['experiment'] for record in records], ['first', 'second'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,258 @@
+from .. import (
+    DefaultExperiment, AsyncDefaultExperiment, ProcessCandidatePool, Recorder, RecordedError,
+    define, iter_calls, science
+)
+from ..recorder import read_segment
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+
+def pair(value):
+    return (value, {1: value})
+
+
+class TestRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.recorder = Recorder(self.directory)
+        self.addCleanup(self.recorder.shutdown)
+
+        self.candidate_calls = []
+        self.ex = DefaultExperiment('recorded')
+        self.ex.recorder = self.recorder
+        self.ex.use(lambda a, b=0: [a, b, a + b])
+        self.ex.try_candidate(lambda *args, **kwargs: self.candidate_calls.append(args))
+
+    def calls(self):
+        self.assertTrue(self.recorder.flush(5))
+        return list(iter_calls(self.directory))
+
+    def test_records_calls_without_running_candidates(self):
+        self.assertEqual(self.ex.run(args=(1,), kwargs={'b': 2}), [1, 2, 3])
+
+        self.assertEqual(self.candidate_calls, [])
+        call = self.calls()[0]
+        self.assertEqual(call['experiment'], 'recorded')
+        self.assertEqual(call['behavior'], 'control')
+        self.assertEqual(call['args'], [1])
+        self.assertEqual(call['kwargs'], {'b': 2})
+        self.assertEqual(call['value'], [1, 2, 3])
+        self.assertGreaterEqual(call['duration'], 0)
+
+    def test_records_cleaned_values_and_exceptions(self):
+        self.ex.cleaner = len
+        self.ex.run(args=(1,))
+
+        ex = DefaultExperiment('failing')
+        ex.recorder = self.recorder
+        ex.use(lambda: {}['missing'])
+        with self.assertRaises(KeyError):
+            ex.run()
+
+        calls = self.calls()
+        self.assertEqual(calls[0]['value'], 3)
+        self.assertEqual(calls[1]['exception'], ['KeyError', "'missing'"])
+
+    def test_refuses_arguments_it_cannot_encode_exactly(self):
+        raised = []
+        self.ex.raised = lambda operation, error: raised.append(operation)
+
+        self.assertEqual(self.ex.run(args=(2 ** 70,)), [2 ** 70, 0, 2 ** 70])
+        self.ex.run(args=((1, 2),), kwargs={'b': (3,)})
+
+        self.assertEqual(raised, ['recorder'])
+        self.assertEqual(self.recorder.dropped, 1)
+        self.assertEqual([call['args'] for call in self.calls()], [[(1, 2)]])
+
+    def test_writes_sampled_calls_without_flushing(self):
+        recorder = Recorder(self.directory, max_age=0.05)
+        self.addCleanup(recorder.shutdown)
+        self.ex.recorder = recorder
+        condition = recorder._condition
+
+        for number in (1, 2):
+            self.ex.run(args=(number,))
+            with condition:
+                self.assertTrue(condition.wait_for(lambda: recorder.published == number, 1))
+
+        self.assertEqual([call['args'] for call in iter_calls(self.directory)], [[1], [2]])
+
+    def test_samples_per_experiment(self):
+        self.ex.percent = 0
+        self.assertEqual(self.ex.run(args=(1,)), [1, 0, 1])
+
+        self.assertEqual(self.calls(), [])
+
+    def test_records_the_context(self):
+        self.ex.context = {'user': 'a'}
+        self.ex.run(args=(1,))
+
+        self.assertEqual(self.calls()[0]['context'], {'user': 'a'})
+
+    def test_rotates_segments_by_size(self):
+        self.recorder.max_segment_size = 500
+        for number in range(20):
+            self.ex.run(args=(number,))
+            self.recorder.flush(5)
+
+        segments = self.recorder.segments()
+        self.assertGreater(len(segments), 1)
+        for segment in segments:
+            self.assertLessEqual(os.path.getsize(segment), 500)
+        self.assertEqual([call['args'] for call in self.calls()], [[n] for n in range(20)])
+
+    def test_continues_after_existing_segments(self):
+        self.ex.run(args=(1,))
+        self.recorder.shutdown()
+
+        recorder = Recorder(self.directory)
+        self.addCleanup(recorder.shutdown)
+        self.ex.recorder = recorder
+        self.ex.run(args=(2,))
+        recorder.flush(5)
+
+        self.assertEqual(len(recorder.segments()), 2)
+        self.assertEqual([call['args'] for call in iter_calls(self.directory)], [[1], [2]])
+
+    def test_reads_segments_with_mmap(self):
+        self.ex.run(args=(1,))
+        self.recorder.flush(5)
+        segment = self.recorder.segments()[0]
+
+        self.assertEqual(list(read_segment(segment))[0]['value'], [1, 0, 1])
+        self.assertEqual(list(iter_calls(segment)), list(read_segment(segment)))
+
+        with open(segment, 'ab') as stream:
+            stream.write(b'\x01\x00')
+        with self.assertRaises(ValueError):
+            list(read_segment(segment))
+
+    def test_ignores_empty_segments(self):
+        open(os.path.join(self.directory, 'calls-00000001.log'), 'wb').close()
+
+        self.assertEqual(list(iter_calls(self.directory)), [])
+
+    def test_science_and_definitions_take_a_recorder(self):
+        with science('science', {'recorder': self.recorder}) as e:
+            e.use(lambda: 1)
+            e.try_candidate(lambda: 2)
+
+        recorded = define('defined', lambda: 2, candidates=lambda: 3, recorder=self.recorder)
+        self.assertEqual(recorded(), 2)
+
+        self.assertEqual([call['value'] for call in self.calls()], [1, 2])
+
+    def test_async_experiments(self):
+        async def control(a):
+            return a * 2
+
+        ex = AsyncDefaultExperiment('async')
+        ex.recorder = self.recorder
+        ex.use(control)
+        ex.try_candidate(lambda a: self.candidate_calls.append(a))
+
+        self.assertEqual(asyncio.run(ex.run(args=(2,))), 4)
+        self.assertEqual(self.candidate_calls, [])
+        self.assertEqual(self.calls()[0]['value'], 4)
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.published = []
+        self.ex = DefaultExperiment('replayed')
+        self.ex.publish = self.published.append
+        self.ex.use(lambda a: (a, a))
+
+    def record(self, **outcome):
+        record = {'behavior': 'control', 'args': [1], 'kwargs': {}, 'duration': 0.1}
+        record.update(outcome)
+        return record
+
+    def test_compares_candidates_with_the_recorded_value(self):
+        self.ex.try_candidate('same', lambda a: (a, a))
+        self.ex.try_candidate('different', lambda a: [a, 0])
+        result = self.ex.replay(self.record(value=(1, 1), context={'user': 'a'}))
+
+        self.assertIs(self.published[0], result)
+        self.assertEqual([o.name for o in result.mismatched], ['different'])
+        self.assertEqual(result.control.duration, 0.1)
+        self.assertEqual(result.context, {'user': 'a'})
+
+    def test_compares_recorded_exceptions(self):
+        def raises(a):
+            raise KeyError(a)
+
+        self.ex.try_candidate('same', raises)
+        self.ex.try_candidate('different', lambda a: {}[a + 1])
+        result = self.ex.replay(self.record(exception=['KeyError', '1']))
+
+        self.assertEqual([o.name for o in result.mismatched], ['different'])
+        self.assertIsInstance(result.control.raised_exception, RecordedError)
+
+    def test_replays_fingerprinted_experiments(self):
+        self.ex.fingerprint_values = True
+        self.ex.try_candidate('same', lambda a: (a, a))
+        self.ex.try_candidate('different', lambda a: (a, 0))
+        result = self.ex.replay(self.record(value=(1, 1)))
+
+        self.assertEqual([o.name for o in result.mismatched], ['different'])
+        for observation in result.observations:
+            self.assertTrue(observation.released)
+
+    def test_replays_fingerprinted_experiments_in_process_pools(self):
+        pool = ProcessCandidatePool(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        self.ex.candidate_pool = pool
+        self.ex.fingerprint_values = True
+        self.ex.try_candidate(pair)
+        result = self.ex.replay(self.record(value=(1, {1: 1})))
+
+        self.assertTrue(result.was_matched)
+
+    def test_replays_a_recording(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        recorder = Recorder(directory)
+        self.addCleanup(recorder.shutdown)
+
+        self.ex.recorder = recorder
+        self.ex.try_candidate(lambda a: (a, -a))
+        for number in range(3):
+            self.ex.run(args=(number,))
+        recorder.flush(5)
+
+        self.ex.recorder = None
+        results = [self.ex.replay(call) for call in iter_calls(directory)]
+        self.assertEqual([result.was_matched for result in results], [True, False, False])
+
+    def test_replays_tuples_and_non_string_keys(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        recorder = Recorder(directory)
+        self.addCleanup(recorder.shutdown)
+
+        def keys(pair, names):
+            return [pair, sorted(names)]
+
+        ex = DefaultExperiment('keys')
+        ex.publish = self.published.append
+        ex.recorder = recorder
+        ex.use(keys)
+        ex.try_candidate(keys)
+        ex.run(args=((1, 2), {1: 'a', 2: 'b'}))
+        recorder.flush(5)
+
+        call = list(iter_calls(directory))[0]
+        self.assertEqual(call['args'], [(1, 2), {1: 'a', 2: 'b'}])
+        self.assertTrue(ex.replay(call).was_matched)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+from .. import DefaultExperiment, RecordWriter, iter_records, to_record
+from ..records import (
+    decode_binary, decode_json, digest, encode_binary, encode_json, encodes_exactly
+)
+
+import io
+import pickle
+import unittest
+
+
+class TestToRecord(unittest.TestCase):
+
+    def setUp(self):
+        self.ex = DefaultExperiment('records')
+        self.ex.context = {'user': 42}
+        self.ex.comparer = lambda a, b: a.returned_value == b.returned_value
+        self.ex.use(lambda: 1)
+
+    def record(self, **options):
+        self.ex.run()
+        record = to_record(self.ex.result, **options)
+        return record, dict((o['name'], o) for o in record['observations'])
+
+    def test_records_the_experiment_and_context(self):
+        self.ex.try_candidate(lambda: 1)
+        record, observations = self.record()
+
+        self.assertEqual(record['version'], 1)
+        self.assertEqual(record['experiment'], 'records')
+        self.assertEqual(record['context'], {'user': 42})
+        self.assertEqual(observations['control']['status'], 'control')
+        self.assertEqual(observations['control']['value'], 1)
+        self.assertEqual(observations['candidate']['status'], 'matched')
+        self.assertIsInstance(observations['candidate']['duration'], float)
+
+    def test_records_mismatches_and_ignores(self):
+        self.ex.try_candidate('mismatched', lambda: 2)
+        self.ex.try_candidate('ignored', lambda: 3)
+        self.ex.add_ignorer(lambda control, candidate: candidate == 3)
+        _, observations = self.record()
+
+        self.assertEqual(observations['mismatched']['status'], 'mismatched')
+        self.assertEqual(observations['ignored']['status'], 'ignored')
+
+    def test_records_exceptions_by_type_and_message(self):
+        def candidate():
+            raise ValueError('kaboom')
+
+        self.ex.try_candidate(candidate)
+        _, observations = self.record()
+
+        self.assertEqual(observations['candidate']['exception'], ['ValueError', 'kaboom'])
+        self.assertNotIn('value', observations['candidate'])
+
+    def test_digests_large_and_unserializable_values(self):
+        self.ex.try_candidate('large', lambda: 'x' * 100)
+        self.ex.try_candidate('object', lambda: object)
+        _, observations = self.record(max_value_size=10)
+
+        self.assertEqual(observations['large']['digest'], digest('"{}"'.format('x' * 100)))
+        self.assertEqual(observations['object']['digest'], digest(repr(object)))
+        self.assertNotIn('value', observations['large'])
+
+    def test_records_cleaned_values(self):
+        self.ex.cleaner = lambda value: value * 10
+        self.ex.try_candidate(lambda: 2)
+        _, observations = self.record()
+
+        self.assertEqual(observations['candidate']['value'], 20)
+
+    def test_records_can_be_pickled(self):
+        self.ex.try_candidate(lambda: 2)
+        record, _ = self.record()
+
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+
+
+class TestEncoding(unittest.TestCase):
+
+    record = {
+        'version': 1,
+        'experiment': 'encoding',
+        'context': {'user': 'ünïcode', 'ratio': 0.5, 'big': 2 ** 70, 'flag': True},
+        'observations': [
+            {'name': 'control', 'status': 'control', 'duration': 0.25, 'value': [1, None, False]},
+            {'name': 'candidate', 'status': 'mismatched', 'duration': None, 'value': b'\x00'},
+        ],
+    }
+
+    def test_binary_round_trip(self):
+        decoded = decode_binary(encode_binary(self.record))
+
+        self.assertEqual(decoded['context']['user'], 'ünïcode')
+        self.assertEqual(decoded['context']['big'], repr(2 ** 70))
+        self.assertEqual(decoded['observations'], self.record['observations'])
+
+    def test_binary_keeps_tuples_and_keys(self):
+        value = {'pair': (1, [2, (3,)]), 1: 'one', (2, 'b'): None, 0.5: b''}
+
+        self.assertEqual(decode_binary(encode_binary(value)), value)
+        self.assertTrue(encodes_exactly(value))
+        self.assertFalse(encodes_exactly({'big': 2 ** 70}))
+        self.assertFalse(encodes_exactly([bytearray(b'')]))
+        self.assertFalse(encodes_exactly({frozenset(): 1}))
+
+    def test_json_round_trip(self):
+        decoded = decode_json(encode_json(self.record))
+
+        self.assertEqual(decoded['context'], self.record['context'])
+        self.assertEqual(decoded['observations'][1]['value'], repr(b'\x00'))
+
+    def test_rejects_unknown_versions(self):
+        frame = bytearray(encode_binary(self.record))
+        frame[0] = 99
+
+        with self.assertRaises(ValueError):
+            decode_binary(bytes(frame))
+
+
+class TestRecordWriter(unittest.TestCase):
+
+    def write(self, stream, binary):
+        writer = RecordWriter(stream, binary=binary)
+        for name in ('first', 'second'):
+            writer.write({'version': 1, 'experiment': name})
+        writer.flush()
+
+    def test_streams_json_lines(self):
+        stream = io.StringIO()
+        self.write(stream, binary=False)
+        stream.seek(0)
+
+        self.assertEqual(
+            [record['experiment'] for record in iter_records(stream)], ['first', 'second']
+        )
+
+    def test_streams_binary_frames(self):
+        stream = io.BytesIO()
+        self.write(stream, binary=True)
+        stream.seek(0)
+
+        self.assertEqual(
+            [record['experiment'] for record in iter_records(stream, binary=True)],
+            ['first', 'second'],
+        )
+
+    def test_detects_truncated_frames(self):
+        stream = io.BytesIO()
+        self.write(stream, binary=True)
+        stream = io.BytesIO(stream.getvalue()[:-1])
+
+        with self.assertRaises(ValueError):
+            list(iter_records(stream, binary=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+from .. import DefaultExperiment, MismatchError, Observation, Result
+
+import unittest
+
+
+class TestResult(unittest.TestCase):
+
+    def setUp(self):
+        self.compared = []
+        self.ex = DefaultExperiment('result')
+        self.ex.comparer = self.comparer
+        self.control = Observation('control', self.ex, lambda: 1)
+        self.candidate = Observation('candidate', self.ex, lambda: 2)
+
+    def comparer(self, a, b):
+        self.compared.append((a.name, b.name))
+        return a.returned_value == b.returned_value
+
+    def test_does_not_compare_until_asked(self):
+        result = Result(self.ex, [self.control, self.candidate], self.control)
+
+        self.assertEqual(self.compared, [])
+        self.assertFalse(result.was_evaluated)
+
+    def test_compares_once_on_first_access(self):
+        result = Result(self.ex, [self.control, self.candidate], self.control)
+
+        self.assertEqual(result.mismatched, (self.candidate,))
+        self.assertEqual(result.ignored, ())
+        self.assertTrue(result.was_mismatched)
+        self.assertFalse(result.was_matched)
+        self.assertEqual(self.compared, [('control', 'candidate')])
+        self.assertTrue(result.was_evaluated)
+
+    def test_ignored_forces_evaluation(self):
+        self.ex.add_ignorer(lambda a, b: True)
+        result = Result(self.ex, [self.control, self.candidate], self.control)
+
+        self.assertEqual(result.ignored, (self.candidate,))
+        self.assertEqual(result.mismatched, ())
+
+    def test_publish_without_reading_skips_comparison(self):
+        self.ex.use(lambda: 1)
+        self.ex.try_candidate(lambda: 2)
+
+        self.assertEqual(self.ex.run(), 1)
+        self.assertEqual(self.compared, [])
+
+    def test_raise_on_mismatch_forces_evaluation(self):
+        self.ex.should_raise_on_mismatch = True
+        self.ex.use(lambda: 1)
+        self.ex.try_candidate(lambda: 2)
+
+        with self.assertRaises(MismatchError):
+            self.ex.run()
+        self.assertEqual(self.compared, [('control', 'candidate')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,218 @@
+from .. import (
+    Aggregator, DefaultExperiment, LatencyHistogram, PairedComparison, Result, Observation,
+    to_record
+)
+
+import random
+import unittest
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles_are_within_precision(self):
+        histogram = LatencyHistogram(precision=0.01)
+        for value in range(1, 1001):
+            histogram.record(value / 1000.0)
+
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.mean, 0.5005)
+        self.assertAlmostEqual(histogram.percentile(50), 0.5, delta=0.5 * 0.01)
+        self.assertAlmostEqual(histogram.percentile(99), 0.99, delta=0.99 * 0.01)
+        self.assertEqual(histogram.percentile(100), 1.0)
+        self.assertEqual(histogram.percentile(0), 0.001)
+
+    def test_memory_is_bounded_by_the_range(self):
+        histogram = LatencyHistogram(precision=0.1)
+        for _ in range(10000):
+            histogram.record(0.01)
+            histogram.record(0.02)
+
+        self.assertEqual(len(histogram.buckets), 2)
+
+    def test_empty_histogram(self):
+        histogram = LatencyHistogram()
+
+        self.assertIsNone(histogram.percentile(50))
+        self.assertIsNone(histogram.mean)
+
+    def test_merge(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(0.001)
+        second.record(1.0)
+        first.merge(second)
+
+        self.assertEqual(first.count, 2)
+        self.assertEqual((first.min, first.max), (0.001, 1.0))
+
+
+class TestPairedComparison(unittest.TestCase):
+
+    def compare(self, ratio, count=200, noise=0.2):
+        generator = random.Random(7)
+        comparison = PairedComparison(min_samples=30)
+        for _ in range(count):
+            control = 0.01 * (1 + generator.uniform(-noise, noise))
+            comparison.record(control, control * ratio * (1 + generator.uniform(-noise, noise)))
+        return comparison
+
+    def test_detects_faster_candidates(self):
+        comparison = self.compare(0.5)
+
+        self.assertEqual(comparison.verdict, PairedComparison.FASTER)
+        self.assertLess(comparison.interval[1], 0)
+        self.assertLess(comparison.effect_size, 0)
+        self.assertAlmostEqual(comparison.relative_change, -0.5, delta=0.05)
+        self.assertLess(comparison.sign_test_p_value, 0.001)
+
+    def test_detects_slower_candidates(self):
+        comparison = self.compare(1.5)
+
+        self.assertEqual(comparison.verdict, PairedComparison.SLOWER)
+        self.assertGreater(comparison.interval[0], 0)
+
+    def test_equal_candidates_are_inconclusive(self):
+        comparison = self.compare(1.0)
+
+        self.assertEqual(comparison.verdict, PairedComparison.INCONCLUSIVE)
+        self.assertLess(comparison.interval[0], 0)
+        self.assertGreater(comparison.interval[1], 0)
+
+    def test_needs_enough_samples(self):
+        comparison = self.compare(0.5, count=10)
+
+        self.assertEqual(comparison.verdict, PairedComparison.INSUFFICIENT)
+
+    def test_empty_comparison(self):
+        snapshot = PairedComparison().snapshot()
+
+        self.assertEqual(snapshot['verdict'], PairedComparison.INSUFFICIENT)
+        self.assertIsNone(snapshot['interval'])
+        self.assertIsNone(snapshot['sign_test_p_value'])
+
+
+class TestAggregator(unittest.TestCase):
+
+    def setUp(self):
+        self.aggregator = Aggregator()
+        self.ex = DefaultExperiment('aggregated')
+        self.ex.aggregator = self.aggregator
+        self.ex.comparer = lambda a, b: a.returned_value == b.returned_value
+        self.ex.use(lambda: 1)
+
+    def raising(self):
+        raise ValueError('kaboom')
+
+    def test_counts_outcomes_per_candidate(self):
+        self.ex.try_candidate('matching', lambda: 1)
+        self.ex.try_candidate('mismatching', lambda: 2)
+        self.ex.try_candidate('raising', self.raising)
+        self.ex.try_candidate('ignored', lambda: 3)
+        self.ex.add_ignorer(lambda control, candidate: candidate == 3)
+
+        for _ in range(3):
+            self.ex.run()
+
+        snapshot = self.aggregator.snapshot()['experiments']['aggregated']
+        candidates = snapshot['candidates']
+        self.assertEqual(snapshot['runs'], 3)
+        self.assertEqual(snapshot['control']['latency']['count'], 3)
+        self.assertEqual(candidates['matching']['matched'], 3)
+        self.assertEqual(candidates['matching']['match_rate'], 1.0)
+        self.assertEqual(candidates['mismatching']['mismatched'], 3)
+        self.assertEqual(candidates['raising']['raised'], 3)
+        self.assertEqual(candidates['raising']['mismatched'], 3)
+        self.assertEqual(candidates['ignored']['ignored'], 3)
+        self.assertIsNone(candidates['ignored']['match_rate'])
+
+    def test_counts_timed_out_candidates(self):
+        control = Observation.from_outcome('control', self.ex, 1, duration=0.01)
+        candidate = Observation.from_outcome('slow', self.ex, timed_out=True)
+        self.aggregator.record(Result(self.ex, (control, candidate), control))
+
+        candidates = self.aggregator.snapshot()['experiments']['aggregated']['candidates']
+        self.assertEqual(candidates['slow']['timed_out'], 1)
+        self.assertEqual(candidates['slow']['latency']['count'], 0)
+
+    def test_percentile_queries(self):
+        for duration in (0.01, 0.02, 0.03):
+            control = Observation.from_outcome('control', self.ex, 1, duration=duration)
+            candidate = Observation.from_outcome('new', self.ex, 1, duration=duration * 2)
+            self.aggregator.record(Result(self.ex, (control, candidate), control))
+
+        self.assertAlmostEqual(self.aggregator.percentile('aggregated', 50), 0.02, delta=0.0002)
+        self.assertAlmostEqual(
+            self.aggregator.percentile('aggregated', 50, 'new'), 0.04, delta=0.0004
+        )
+        self.assertIsNone(self.aggregator.percentile('aggregated', 50, 'missing'))
+        self.assertIsNone(self.aggregator.percentile('missing', 50))
+
+    def record_pairs(self, count, ratio, raised=None):
+        for _ in range(count):
+            control = Observation.from_outcome('control', self.ex, 1, duration=0.01)
+            candidate = Observation.from_outcome(
+                'new', self.ex, 1, raised_exception=raised,
+                duration=0.01 * ratio * random.uniform(0.9, 1.1)
+            )
+            self.aggregator.record(Result(self.ex, (control, candidate), control))
+
+    def test_compares_candidate_latency(self):
+        self.aggregator = Aggregator(min_samples=5)
+        self.ex.aggregator = self.aggregator
+        self.record_pairs(10, ratio=2)
+
+        comparison = self.aggregator.snapshot()['experiments']['aggregated']['candidates']['new'][
+            'latency_comparison'
+        ]
+        self.assertEqual(comparison['verdict'], PairedComparison.SLOWER)
+        self.assertEqual(comparison['count'], 10)
+        self.assertEqual(self.aggregator.verdict('aggregated', 'new'), PairedComparison.SLOWER)
+        self.assertEqual(
+            self.aggregator.verdict('aggregated', 'missing'), PairedComparison.INSUFFICIENT
+        )
+
+    def test_skips_raised_runs_when_comparing_latency(self):
+        self.record_pairs(10, ratio=2, raised=ValueError())
+
+        self.assertEqual(self.aggregator.snapshot()['experiments']['aggregated']['candidates'][
+            'new']['latency_comparison']['count'], 0)
+
+    def test_records_include_the_latency_verdict(self):
+        self.ex.try_candidate('new', lambda: 1)
+        self.ex.run()
+
+        record = to_record(self.ex.result)
+        candidate = [o for o in record['observations'] if o['name'] == 'new'][0]
+        self.assertEqual(candidate['latency_verdict'], PairedComparison.INSUFFICIENT)
+
+    def test_snapshot_and_reset(self):
+        self.ex.try_candidate(lambda: 1)
+        self.ex.run()
+
+        snapshot = self.aggregator.snapshot(reset=True)
+        self.assertEqual(snapshot['experiments']['aggregated']['runs'], 1)
+        self.assertEqual(self.aggregator.snapshot()['experiments'], {})
+
+    def test_snapshots_periodically(self):
+        snapshots = []
+        self.aggregator = Aggregator(interval=0, on_snapshot=snapshots.append)
+        self.ex.aggregator = self.aggregator
+        self.ex.try_candidate(lambda: 1)
+
+        self.ex.run()
+        self.ex.run()
+
+        self.assertEqual(len(snapshots), 2)
+        self.assertEqual(snapshots[1]['experiments']['aggregated']['runs'], 1)
+
+    def test_aggregator_errors_are_reported(self):
+        reported = []
+        self.ex.raised = lambda operation, exception: reported.append(operation)
+        self.ex.aggregator = Aggregator(interval=0, on_snapshot=lambda snapshot: 1 / 0)
+        self.ex.try_candidate(lambda: 1)
+
+        self.assertEqual(self.ex.run(), 1)
+        self.assertEqual(reported, ['aggregator'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+from .. import (
+    DefaultExperiment, CandidatePool, ProcessCandidatePool, DeepComparer, MismatchError,
+    ObservedStream, to_record
+)
+
+import gc
+import threading
+import unittest
+
+
+def numbers(count=5):
+    for number in range(count):
+        yield number
+
+
+def failing(after):
+    for number in range(after):
+        yield number
+    raise ValueError('broken')
+
+
+class TestStreams(unittest.TestCase):
+
+    def setUp(self):
+        self.published = []
+        self.ex = DefaultExperiment('streams')
+        self.ex.publish = self.published.append
+        self.ex.use(numbers)
+
+    def test_returns_the_control_elements(self):
+        self.ex.try_candidate(numbers)
+        stream = self.ex.run_stream()
+
+        self.assertIsInstance(stream, ObservedStream)
+        self.assertEqual(list(stream), [0, 1, 2, 3, 4])
+        result = self.published[0]
+        self.assertTrue(result.was_matched)
+        self.assertEqual(result.control.count, 5)
+        self.assertEqual(result.candidates[0].count, 5)
+        self.assertIs(stream.result, result)
+        self.assertIs(self.ex.result, result)
+
+    def test_advances_candidates_in_lock_step(self):
+        consumed = []
+
+        def candidate():
+            for number in range(5):
+                consumed.append(number)
+                yield number
+
+        self.ex.try_candidate(candidate)
+        stream = self.ex.run_stream()
+
+        self.assertEqual(consumed, [])
+        next(stream)
+        next(stream)
+        self.assertEqual(consumed, [0, 1])
+
+    def test_records_the_first_diverging_index(self):
+        self.ex.try_candidate(lambda: iter([0, 1, 7, 8, 4]))
+        self.assertEqual(list(self.ex.run_stream()), [0, 1, 2, 3, 4])
+
+        result = self.published[0]
+        candidate = result.mismatched[0]
+        self.assertEqual(candidate.diverged_at, 2)
+        self.assertEqual(candidate.returned_value, 7)
+        self.assertEqual(candidate.expected.returned_value, 2)
+        self.assertEqual(result.differences, {'candidate': [('[2]', 2, 7)]})
+        self.assertEqual(to_record(result)['observations'][1]['diverged_at'], 2)
+
+    def test_stops_advancing_diverged_candidates(self):
+        consumed = []
+
+        def candidate():
+            for number in (0, 9, 2, 3, 4):
+                consumed.append(number)
+                yield number
+
+        self.ex.try_candidate(candidate)
+        list(self.ex.run_stream())
+
+        self.assertEqual(consumed, [0, 9])
+
+    def test_length_differences(self):
+        self.ex.try_candidate('shorter', lambda: numbers(3))
+        self.ex.try_candidate('longer', lambda: numbers(6))
+        list(self.ex.run_stream())
+
+        diverged = dict((o.name, o.diverged_at) for o in self.published[0].mismatched)
+        self.assertEqual(diverged, {'shorter': 3, 'longer': 5})
+
+    def test_compares_exceptions(self):
+        self.ex = DefaultExperiment('streams')
+        self.ex.publish = self.published.append
+        self.ex.use(lambda: failing(2))
+        self.ex.try_candidate('same', lambda: failing(2))
+        self.ex.try_candidate('early', lambda: failing(1))
+        stream = self.ex.run_stream()
+
+        self.assertEqual([next(stream), next(stream)], [0, 1])
+        with self.assertRaises(ValueError):
+            next(stream)
+        result = self.published[0]
+        self.assertEqual([o.name for o in result.mismatched], ['early'])
+        self.assertIsInstance(result.control.raised_exception, ValueError)
+
+    def test_raises_when_the_control_cannot_be_opened(self):
+        def control():
+            raise KeyError('missing')
+
+        self.ex = DefaultExperiment('streams')
+        self.ex.publish = self.published.append
+        self.ex.use(control)
+        self.ex.try_candidate(numbers)
+
+        with self.assertRaises(KeyError):
+            self.ex.run_stream()
+        self.assertEqual(self.published[0].mismatched[0].diverged_at, 0)
+
+    def test_closing_early_compares_the_consumed_prefix(self):
+        closed = []
+
+        def candidate():
+            try:
+                for number in range(100):
+                    yield number
+            finally:
+                closed.append(True)
+
+        self.ex.try_candidate(candidate)
+        with self.ex.run_stream() as stream:
+            self.assertEqual(next(stream), 0)
+
+        self.assertTrue(self.published[0].was_matched)
+        self.assertEqual(self.published[0].control.count, 1)
+        self.assertEqual(closed, [True])
+
+    def test_publishes_abandoned_streams(self):
+        self.ex.try_candidate(numbers)
+        stream = self.ex.run_stream()
+        next(stream)
+        del stream
+        gc.collect()
+
+        self.assertEqual(len(self.published), 1)
+
+    def test_uses_the_cleaner_and_element_comparer(self):
+        self.ex.try_candidate(lambda: iter([0.0, 1.0, 2.0, 3.0, 4.001]))
+        self.ex.element_comparer = DeepComparer(tolerance=0.01).equal
+        list(self.ex.run_stream())
+        self.assertTrue(self.published[0].was_matched)
+
+        self.ex.element_comparer = None
+        self.ex.cleaner = round
+        list(self.ex.run_stream())
+        self.assertTrue(self.published[1].was_matched)
+
+    def test_ignorers_see_the_diverging_elements(self):
+        self.ex.try_candidate(lambda: iter([0, 1, 2, 3, -4]))
+        self.ex.add_ignorer(lambda control, candidate: (control, candidate) == (4, -4))
+        list(self.ex.run_stream())
+
+        self.assertTrue(self.published[0].was_ignored)
+
+    def test_raises_on_mismatch(self):
+        self.ex.should_raise_on_mismatch = True
+        self.ex.try_candidate(lambda: numbers(4))
+        stream = self.ex.run_stream()
+
+        with self.assertRaises(MismatchError):
+            list(stream)
+
+    def test_returns_the_control_iterable_when_disabled(self):
+        self.ex.percent = 0
+        self.ex.try_candidate(numbers)
+        stream = self.ex.run_stream(args=(2,))
+
+        self.assertNotIsInstance(stream, ObservedStream)
+        self.assertEqual(list(stream), [0, 1])
+        self.assertEqual(self.published, [])
+
+    def test_process_pools_fall_back_to_lock_step(self):
+        pool = ProcessCandidatePool(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        self.ex.candidate_pool = pool
+        self.ex.try_candidate(numbers)
+        list(self.ex.run_stream())
+
+        self.assertTrue(self.published[0].was_matched)
+
+
+class TestWindowedStreams(unittest.TestCase):
+
+    def setUp(self):
+        self.published = []
+        self.done = threading.Event()
+        self.pool = CandidatePool(max_workers=2)
+        self.addCleanup(self.pool.shutdown)
+        self.ex = DefaultExperiment('streams')
+        self.ex.candidate_pool = self.pool
+        self.ex.publish = self.publish
+        self.ex.use(lambda: numbers(50))
+
+    def publish(self, result):
+        self.published.append(result)
+        self.done.set()
+
+    def test_candidates_follow_in_the_pool(self):
+        self.ex.try_candidate('same', lambda: numbers(50))
+        self.ex.try_candidate('other', lambda: iter(list(range(10)) + [-1] * 40))
+
+        self.assertEqual(list(self.ex.run_stream()), list(range(50)))
+        self.assertTrue(self.done.wait(5))
+        result = self.published[0]
+        self.assertEqual([o.name for o in result.mismatched], ['other'])
+        self.assertEqual(result.mismatched[0].diverged_at, 10)
+
+    def test_candidates_that_fall_behind_are_timed_out(self):
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return numbers(50)
+
+        self.ex.stream_window = 5
+        self.ex.try_candidate(slow)
+        self.assertEqual(len(list(self.ex.run_stream())), 50)
+        release.set()
+
+        self.assertTrue(self.done.wait(5))
+        self.assertTrue(self.published[0].was_timed_out)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+from .. import DefaultExperiment, Observation, OverheadThrottle, Result
+
+import unittest
+
+
+class TestOverheadThrottle(unittest.TestCase):
+
+    def setUp(self):
+        self.ex = DefaultExperiment('throttled')
+
+    def result(self, control_duration, candidate_duration):
+        control = Observation.from_outcome('control', self.ex, 1, duration=control_duration)
+        candidate = Observation.from_outcome('candidate', self.ex, 1, duration=candidate_duration)
+        return Result(self.ex, [control, candidate], control)
+
+    def test_needs_a_target(self):
+        with self.assertRaises(ValueError):
+            OverheadThrottle()
+
+    def test_lowers_the_rate_to_meet_the_target_ratio(self):
+        throttle = OverheadThrottle(target_ratio=0.02, smoothing=1)
+        throttle.record(self.result(0.010, 0.010))
+
+        self.assertAlmostEqual(throttle.rate, 0.02)
+
+    def test_raises_the_rate_when_candidates_get_cheaper(self):
+        throttle = OverheadThrottle(target_ratio=0.02, smoothing=1)
+        throttle.record(self.result(0.010, 0.010))
+        throttle.record(self.result(0.010, 0.001))
+
+        self.assertAlmostEqual(throttle.rate, 0.2)
+
+    def test_keeps_the_rate_within_bounds(self):
+        throttle = OverheadThrottle(target_ratio=0.02, min_rate=0.05, smoothing=1)
+        throttle.record(self.result(0.001, 1))
+        self.assertEqual(throttle.rate, 0.05)
+
+        throttle.record(self.result(1, 0.001))
+        self.assertEqual(throttle.rate, 1.0)
+
+    def test_lowers_the_rate_to_meet_the_candidate_seconds_budget(self):
+        throttle = OverheadThrottle(candidate_seconds_per_second=0.1, smoothing=1)
+        throttle.call_rate = 100
+        throttle.record(self.result(0.010, 0.010))
+
+        self.assertAlmostEqual(throttle.rate, 0.1)
+
+    def test_counts_its_decisions(self):
+        throttle = OverheadThrottle(target_ratio=0.5, initial_rate=0.5)
+        for _ in range(1000):
+            throttle.should_run()
+
+        snapshot = throttle.snapshot()
+        self.assertEqual(snapshot['enrolled'] + snapshot['skipped'], 1000)
+        self.assertGreater(snapshot['enrolled'], 0)
+        self.assertGreater(snapshot['skipped'], 0)
+
+    def test_experiment_consults_and_feeds_the_throttle(self):
+        seen = []
+        throttle = OverheadThrottle(target_ratio=0.02, smoothing=1)
+        self.ex.throttle = throttle
+        self.ex.publish = lambda result: seen.append(result.experiment.throttle.rate)
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(lambda: 'candidate')
+
+        self.assertEqual(self.ex.run(), 'control')
+        self.assertEqual(throttle.enrolled, 1)
+        self.assertEqual(seen, [throttle.rate])
+        self.assertIsNotNone(throttle.control_time)
+
+        throttle.rate = 0
+        self.assertEqual(self.ex.run(), 'control')
+        self.assertEqual(throttle.skipped, 1)
+        self.assertEqual(len(seen), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
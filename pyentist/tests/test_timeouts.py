@@ -0,0 +1,96 @@
+from .. import DefaultExperiment, CandidatePool, Observation, Result
+
+import threading
+import time
+import unittest
+
+
+class TestTimeouts(unittest.TestCase):
+
+    def setUp(self):
+        self.published = []
+        self.ex = DefaultExperiment('timeouts')
+        self.ex.publish = self.published.append
+
+    def test_timed_out_observations_are_neither_mismatched_nor_ignored(self):
+        control = Observation('control', self.ex, lambda: 1)
+        candidate = Observation.from_outcome('candidate', self.ex, duration=1, timed_out=True)
+        self.ex.add_ignorer(lambda a, b: True)
+
+        result = Result(self.ex, [control, candidate], control)
+
+        self.assertEqual(result.timed_out, (candidate,))
+        self.assertTrue(result.was_timed_out)
+        self.assertFalse(result.was_mismatched)
+        self.assertFalse(result.was_ignored)
+
+    def test_marks_serial_candidates_over_the_timeout(self):
+        self.ex.candidate_timeout = 0.01
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate('slow', lambda: time.sleep(0.02) or 'slow')
+        self.ex.try_candidate('fast', lambda: 'control')
+
+        self.assertEqual(self.ex.run(), 'control')
+        result = self.published[0]
+        self.assertEqual([o.name for o in result.timed_out], ['slow'])
+        self.assertIsNone(result.timed_out[0].returned_value)
+        self.assertGreater(result.timed_out[0].duration, 0.01)
+
+    def test_skips_serial_candidates_once_the_budget_is_spent(self):
+        ran = []
+        self.ex.overhead_budget = 0
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate('a', lambda: ran.append('a'))
+        self.ex.try_candidate('b', lambda: ran.append('b'))
+
+        self.assertEqual(self.ex.run(), 'control')
+        self.assertEqual(ran, [])
+        self.assertEqual(len(self.published[0].timed_out), 2)
+
+    def test_does_not_raise_on_mismatch_for_timed_out_candidates(self):
+        self.ex.should_raise_on_mismatch = True
+        self.ex.overhead_budget = 0
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate(lambda: 'candidate')
+
+        self.assertEqual(self.ex.run(), 'control')
+
+    def test_abandons_pooled_candidates_over_the_timeout(self):
+        release = threading.Event()
+        pool = CandidatePool(max_workers=2)
+        self.ex.candidate_pool = pool
+        self.ex.candidate_timeout = 0.01
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate('slow', lambda: release.wait(5))
+
+        started = time.time()
+        self.assertEqual(self.ex.run(), 'control')
+        self.assertLess(time.time() - started, 1)
+
+        (candidate,) = self.published[0].timed_out
+        self.assertEqual(candidate.name, 'slow')
+
+        release.set()
+        pool.shutdown()
+
+    def test_abandons_pooled_candidates_over_the_overhead_budget(self):
+        release = threading.Event()
+        pool = CandidatePool(max_workers=2)
+        self.ex.candidate_pool = pool
+        self.ex.overhead_budget = 0.005
+        self.ex.comparer = lambda a, b: a.returned_value == b.returned_value
+        self.ex.use(lambda: 'control')
+        self.ex.try_candidate('slow', lambda: release.wait(5))
+        self.ex.try_candidate('fast', lambda: 'control')
+
+        self.assertEqual(self.ex.run(), 'control')
+        result = self.published[0]
+        self.assertEqual([o.name for o in result.timed_out], ['slow'])
+        self.assertTrue(result.was_matched)
+
+        release.set()
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import random
+import threading
+import time
+
+
+class OverheadThrottle(object):
+
+    def __init__(self, target_ratio=None, candidate_seconds_per_second=None,
+                 initial_rate=1.0, min_rate=0.0001, max_rate=1.0, smoothing=0.1):
+        if target_ratio is None and candidate_seconds_per_second is None:
+            raise ValueError('target_ratio or candidate_seconds_per_second must be set')
+
+        self.target_ratio = target_ratio
+        self.candidate_seconds_per_second = candidate_seconds_per_second
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.smoothing = smoothing
+
+        self.rate = initial_rate
+        self.enrolled = 0
+        self.skipped = 0
+
+        self.control_time = None
+        self.candidate_time = None
+        self.call_rate = None
+
+        self._calls = 0
+        self._window_started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def should_run(self):
+        self._calls += 1
+        if random.random() < self.rate:
+            self.enrolled += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def _average(self, average, value):
+        if average is None:
+            return value
+        return average + self.smoothing * (value - average)
+
+    def record(self, result):
+        control = result.control
+        if control is None or control.duration is None:
+            return
+
+        candidate_time = sum(
+            candidate.duration
+            for candidate in result.candidates
+            if candidate.duration is not None
+        )
+
+        with self._lock:
+            self.control_time = self._average(self.control_time, control.duration)
+            self.candidate_time = self._average(self.candidate_time, candidate_time)
+
+            now = time.monotonic()
+            elapsed = now - self._window_started
+            if elapsed >= 1:
+                self.call_rate = self._average(self.call_rate, self._calls / elapsed)
+                self._calls = 0
+                self._window_started = now
+
+            self.rate = self._target_rate()
+
+    def _target_rate(self):
+        rates = [self.max_rate]
+
+        if self.candidate_time:
+            if self.target_ratio is not None:
+                rates.append(self.target_ratio * self.control_time / self.candidate_time)
+            if self.candidate_seconds_per_second is not None and self.call_rate:
+                rates.append(
+                    self.candidate_seconds_per_second / (self.call_rate * self.candidate_time)
+                )
+
+        return max(self.min_rate, min(rates))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'enrolled': self.enrolled,
+                'skipped': self.skipped,
+                'control_time': self.control_time,
+                'candidate_time': self.candidate_time,
+                'call_rate': self.call_rate,
+            }